@@ -12,6 +12,7 @@ run queries and reduce results.
 """
 import pathlib as pt
 import time
+from functools import partial
 from typing import Annotated, Any, Callable, Collection, TypeVar
 
 import numpy as np
@@ -627,7 +628,7 @@ class CrossMatchDatabase:
                 # -- Managing the overwrite protocol -- #
                 # -- Setup -- #
                 # fix the function signature.
-                f = lambda *a, **k: function(self, *a, **k)
+                f = partial(function, self)
 
                 # add TQDM params to meta_kwargs if not specified.
                 if "tqdm_kwargs" not in meta_kwargs:
@@ -651,10 +652,7 @@ class CrossMatchDatabase:
                     _args, _kwargs = afunc(self, flag, otable_name)
 
                     args = list(args) + list(_args)
-                    kwargs = {
-                        **kwargs,
-                        **{k: v for k, v in _kwargs.items() if k not in kwargs},
-                    }
+                    kwargs = {**_kwargs, **kwargs}
                 else:
                     pass
 
@@ -757,7 +755,7 @@ class CrossMatchDatabase:
                 """
                 # -- Setup -- #
                 # fix the function signature.
-                f = lambda *a, **k: function(self, *a, **k)
+                f = partial(function, self)
 
                 # add TQDM params to meta_kwargs if not specified.
                 if "tqdm_kwargs" not in meta_kwargs:
@@ -780,10 +778,7 @@ class CrossMatchDatabase:
                     _args, _kwargs = afunc(self, flag, table)
 
                     args = list(_args) + list(args)
-                    kwargs = {
-                        **kwargs,
-                        **{k: v for k, v in _kwargs.items() if k not in kwargs},
-                    }
+                    kwargs = {**_kwargs, **kwargs}
 
                 else:
                     pass
@@ -913,14 +908,12 @@ class CrossMatchDatabase:
     def _score(self, table_chunk, *args, **kwargs):
         _ = kwargs
         weight_dict = args[0]
-        table_chunk["SCORE"] = np.sum(
-            np.array(
-                [
-                    v * np.array(table_chunk[f"{k}_SCORE"])
-                    for k, v in weight_dict.items()
-                ]
-            ),
-            axis=0,
+        # weighted sum as a single (n_rows, n_scores) @ (n_scores,) product rather than stacking scaled copies.
+        _scores = table_chunk[[f"{k}_SCORE" for k in weight_dict]].to_numpy(
+            dtype="float64"
+        )
+        table_chunk["SCORE"] = _scores @ np.fromiter(
+            weight_dict.values(), dtype="float64", count=len(weight_dict)
         )
 
         return table_chunk
@@ -1265,7 +1258,7 @@ class CrossMatchDatabase:
         # -- kwargs / args management -- #
         hips_kwargs, scatter_kwargs = (
             {} if hips_kwargs is None else hips_kwargs,
-            {} if scatter_kwargs is None else scatter_kwargs,
+            {} if scatter_kwargs is None else dict(scatter_kwargs),
         )
 
         if fig is None:
@@ -1332,13 +1325,18 @@ class CrossMatchDatabase:
         # -- Manage the scatter plot -- #
 
         # Fetch the corrected parameters
-        for _sra, _sdec in zip(_ra, _dec):
-            ax.scatter(
-                _sra,
-                _sdec,
-                transform=ax.get_transform("world"),
-                **scatter_kwargs,
-            )
+        # All of the matches go into a single collection; one artist per match forces a separate transform
+        # and draw pass for every point. Colors still step through the property cycle unless specified.
+        if "c" not in scatter_kwargs and "color" not in scatter_kwargs:
+            _cycle = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+            scatter_kwargs["c"] = [_cycle[i % len(_cycle)] for i in range(len(_ra))]
+
+        ax.scatter(
+            np.asarray(_ra),
+            np.asarray(_dec),
+            transform=ax.get_transform("world"),
+            **scatter_kwargs,
+        )
 
         # adding source position scatter
         ax.scatter(
@@ -273,7 +273,7 @@ class Schema(pyn.BaseModel):
 
             case "txt":
                 with open(filename, "r") as f:
-                    _r = {k: v for k, v in [u.split(":") for u in f.read().split(",")]}
+                    _r = dict(u.split(":") for u in f.read().split(","))
             case _:
                 raise ValueError(f"Failed to recognize format {file_format}.")
 
@@ -639,9 +639,17 @@ class SchemaRegistry(Registry):
         super().__init__(mapping)
 
         self.schema_class: Type[Schema] = schema_class
+        self._schemas: dict[str, Schema] = {}
 
     def __getitem__(self, item: str) -> Schema:
-        return self.schema_class.read(super().__getitem__(item))
+        # Each file is only parsed (and validated) once; a deep copy is returned so that callers may still alter their
+        # schema without affecting anyone else's.
+        path = str(super().__getitem__(item))
+
+        if path not in self._schemas:
+            self._schemas[path] = self.schema_class.read(path)
+
+        return self._schemas[path].model_copy(deep=True)
 
     @classmethod
     def from_directory(cls, directory, schema_class: Type[Schema]):
@@ -126,16 +126,20 @@ class Haversine_RBF(StationaryKernelMixin, NormalizedKernelMixin, Kernel):
         X = np.atleast_2d(X)
         length_scale = _check_length_scale(X, self.length_scale)
         if Y is None:
-            dists = haversine_distances(X) ** 2
-            K = np.exp(-0.5 * dists / length_scale**2)
-            # convert from upper-triangular matrix to square matrix
-            # K = squareform(K)
-            np.fill_diagonal(K, 1)
+            dists = haversine_distances(X)
         else:
             if eval_gradient:
                 raise ValueError("Gradient can only be evaluated when Y is None.")
-            dists = haversine_distances(X, Y) ** 2
-            K = np.exp(-0.5 * dists / length_scale**2)
+            dists = haversine_distances(X, Y)
+
+        # Square in place and fold the scalar factors together before touching the pairwise array so that
+        # only a single (n_X, n_Y) temporary is allocated for K.
+        np.square(dists, out=dists)
+        K = dists * (-0.5 / length_scale**2)
+        np.exp(K, out=K)
+
+        if Y is None:
+            np.fill_diagonal(K, 1)
 
         if eval_gradient:
             if self.hyperparameter_length_scale.fixed:
@@ -1,13 +1,14 @@
 """
 Regression tools for pyXMIP
 """
+import warnings
 from types import SimpleNamespace
 
 import numpy as np
+from astropy import units
 from astropy.coordinates import SkyCoord
 from sklearn.model_selection import train_test_split
 from sklearn.neighbors import KNeighborsRegressor, RadiusNeighborsRegressor
-from tqdm.contrib.concurrent import process_map
 
 from pyXMIP.utilities.geo import convert_skycoord
 from pyXMIP.utilities.logging import mainlog
@@ -46,12 +47,19 @@ class PoissonMapRegressor:
         """
         self.regressor = regressor_class(
             **{
-                k: (v if k not in kwargs else kwargs[k])
+                k: kwargs.get(k, v)
                 for k, v in self.__class__.regressor_parameters.items()
             }
         )
 
-    def train_model(self, count_table, object_type, training_fraction=None, **kwargs):
+    def train_model(
+        self,
+        count_table,
+        object_type,
+        training_fraction=None,
+        positions_and_areas=None,
+        **kwargs,
+    ):
         """
         Train the regression model on a ``COUNTS`` table.
 
@@ -63,6 +71,8 @@ class PoissonMapRegressor:
             The specific object type to model.
         training_fraction: float
             The training fraction.
+        positions_and_areas: tuple, optional
+            The output of :py:meth:`get_positions_and_areas` for ``count_table``, if it has already been computed.
         **kwargs
             Additional kwargs.
         """
@@ -77,7 +87,7 @@ class PoissonMapRegressor:
         ), f"Failed to find {object_type} in provided table."
 
         # -- Fetching data -- #
-        X, Y = self._sanitize_points(count_table, object_type)
+        X, Y = self._sanitize_points(count_table, object_type, positions_and_areas)
         mainlog.debug(
             f"Training {self.regressor} on {int(training_fraction * Y.size)} data-points"
         )
@@ -108,7 +118,13 @@ class PoissonMapRegressor:
             )
 
     def cross_validate(
-        self, count_table, object_type, training_kw=None, param_kw=None, **kwargs
+        self,
+        count_table,
+        object_type,
+        training_kw=None,
+        param_kw=None,
+        positions_and_areas=None,
+        **kwargs,
     ):
         """
         Cross-validate the regressor against the available count data.
@@ -123,6 +139,8 @@ class PoissonMapRegressor:
             Training kwargs.
         param_kw: dict
             Parameter kwargs
+        positions_and_areas: tuple, optional
+            The output of :py:meth:`get_positions_and_areas` for ``count_table``, if it has already been computed.
         kwargs:
             Additional kwargs to pass.
         """
@@ -131,7 +149,7 @@ class PoissonMapRegressor:
         mainlog.debug(f"Cross-validating {self}.")
         # -- SETUP -- #
         # grab data
-        X, Y = self._sanitize_points(count_table, object_type)
+        X, Y = self._sanitize_points(count_table, object_type, positions_and_areas)
 
         # fix parameters
         if training_kw is None:
@@ -154,28 +172,54 @@ class PoissonMapRegressor:
 
         return cv_estimator.cv_results_
 
-    def _sanitize_points(self, count_table, object_type):
+    def _sanitize_points(self, count_table, object_type, positions_and_areas=None):
         """Pull count data and fix issues."""
-        RA, DEC, N, R = (
+        if positions_and_areas is None:
+            positions_and_areas = self.get_positions_and_areas(count_table)
+
+        X, A = positions_and_areas
+        N = np.array(count_table[object_type])
+
+        Y = N / A
+
+        return X, Y
+
+    @staticmethod
+    def get_positions_and_areas(count_table):
+        """
+        Fetch the (haversine convention) positions and the sample areas of a ``COUNTS`` table.
+
+        These only depend on the table and not on the object type. Callers fitting the same table more than once (e.g.
+        cross-validating and then training) can compute them once and pass them through ``positions_and_areas``.
+
+        Parameters
+        ----------
+        count_table: :py:class:`astropy.table.Table`
+            The table of counts.
+
+        Returns
+        -------
+        X: numpy.ndarray
+            The ``(N, 2)`` array of positions (``theta``, ``phi``).
+        A: numpy.ndarray
+            The area of each sample (arcmin^2).
+        """
+        RA, DEC, R = (
             np.array(count_table["RA"]),
             np.array(count_table["DEC"]),
-            np.array(count_table[object_type]),
             np.array(count_table["RAD"]),
         )
 
         # RA and DEC need to be converted to standardized lat-lon. USE MATH CONVENTION
-        positions = SkyCoord(ra=RA, dec=DEC, unit="deg")
+        positions = SkyCoord(ra=RA, dec=DEC, unit=units.deg)
         phi, theta = convert_skycoord(positions, "math_convention")
-        # phi,theta = np.deg2rad(RA),np.deg2rad(DEC)
         # Fixing R and getting areas.
         # NOTE: we always use N/arcmin^2. The RAD is always already in ARCMIN.
-        A = np.pi * (R**2)
-        density = N / A
+        A = np.ascontiguousarray(np.pi * (R**2), dtype="float64")
 
-        X = np.vstack([theta, phi]).T  # --> Enforced haversine convention.
-        Y = density
+        X = np.column_stack((theta, phi))  # --> Enforced haversine convention.
 
-        return X, Y
+        return X, A
 
 
 class BayesianPoissonMapRegressor:
@@ -230,8 +274,31 @@ class BayesianPoissonMapRegressor:
             )
 
     def _build_map_MAP_analytic(self, count_table, object_type, **kwargs):
-        _ = kwargs
-        count_table = count_table
+        """
+        Compute the analytic MAP estimate of the rate in each HEALPix pixel (no prior, no model).
+
+        Parameters
+        ----------
+        count_table: :py:class:`astropy.table.Table`
+            The count data. Must have ``PIX_ID``, ``RAD`` and ``object_type`` columns.
+        object_type: str
+            The column of ``count_table`` holding the counts.
+        kwargs
+            Ignored. ``mp_kwargs`` is deprecated and has no effect (passing it raises a :py:class:`DeprecationWarning`):
+            the estimate is a pair of (weighted) bincounts and is no longer multiprocessed.
+
+        Returns
+        -------
+        numpy.ndarray
+            The estimated rate (per unit area) in each pixel up to the largest ``PIX_ID``. Pixels without samples are 0.
+        """
+        if "mp_kwargs" in kwargs:
+            warnings.warn(
+                "mp_kwargs is deprecated and ignored; the analytic MAP estimate is no longer multiprocessed.",
+                DeprecationWarning,
+                stacklevel=3,
+            )
+
         # ==================================== #
         # Discretizing data observations
         # ==================================== #
@@ -240,68 +307,25 @@ class BayesianPoissonMapRegressor:
             count_table[object_type],
             count_table["RAD"],
         )
-        A = np.array(np.pi * (RAD**2), dtype="float64")
-        PIX_ID = np.array(PIX_ID, dtype="uint32")
-        N = np.array(N, dtype="uint32")
+        RAD = np.asarray(RAD, dtype="float64")
+        PIX_ID = np.asarray(PIX_ID, dtype="intp")
+        N = np.asarray(N, dtype="float64")
 
         # ==================================== #
         # Getting Estimates
         # ==================================== #
-        from itertools import repeat
-
-        from pyXMIP.utilities.optimize import created_shared_memory_equivalent, split
-
-        estimates = np.zeros(
-            np.amax(PIX_ID) + 1, dtype="float64"
-        )  # generate PIX_ID count. ! Not necessarily all HP, might cut off end.
-        mp_kwargs = kwargs.pop(
-            "mp_kwargs", {"multiprocess": True, "nproc": 8, "chunksize": 100}
-        )
-        if not mp_kwargs.get("multiprocess", True):
-            mp_kwargs = {"multiprocess": False, "nproc": 1, "chunksize": len(estimates)}
-        # Produce the shared memory regions #
-        SMI, SMN, SMA, SME = (
-            created_shared_memory_equivalent(PIX_ID),
-            created_shared_memory_equivalent(N),
-            created_shared_memory_equivalent(A),
-            created_shared_memory_equivalent(estimates),
-        )
-        # Chunk generation #
-        PIX_GROUPS = split(PIX_ID, len(PIX_ID) // mp_kwargs.get("chunksize", 100))
-        # run #
-        process_map(
-            self._get_map_analytic_estimates_mp,
-            PIX_GROUPS,
-            repeat(SMI),
-            repeat(SMN),
-            repeat(SMA),
-            repeat(SME),
-            max_workers=mp_kwargs.get("nproc", 8),
-            desc="Computing MAP estimate (ANYTC)",
-        )
-
-        # recover shared memory regions #
-        ee = np.frombuffer(SME.buf)[:]
-        estimates = ee.copy()
-        del ee
-        for u in [SMI, SMN, SMA, SME]:
-            u.close()
-            u.unlink()
+        # The estimate in each pixel is (total count) / (total area) over the samples in that pixel. Both sums are a
+        # single (weighted) bincount over the pixel ids. Pixels without any samples are left at zero.
+        # The areas are never needed per sample: pi is factored out of the sum and applied to the per-pixel totals.
+        # ! Not necessarily all HP, might cut off end.
+        N_sum = np.bincount(PIX_ID, weights=N)
+        A_sum = np.bincount(PIX_ID, weights=np.square(RAD))
+        A_sum *= np.pi
+
+        estimates = np.zeros(len(A_sum), dtype="float64")
+        np.divide(N_sum, A_sum, out=estimates, where=A_sum > 0)
         return estimates
 
-    @staticmethod
-    def _get_map_analytic_estimates_mp(pxg, PIX_ID, N, A, E):
-        n, a, ee, i = (
-            np.frombuffer(N.buf, dtype="uint32"),
-            np.frombuffer(A.buf),
-            np.frombuffer(E.buf),
-            np.frombuffer(PIX_ID.buf, dtype="uint32"),
-        )
-
-        for pi in pxg:
-            if pi in i:
-                ee[pi] = np.sum(n[np.where(i == pi)]) / np.sum(a[np.where(i == pi)])
-
 
 class KNNeighborMapRegressor(PoissonMapRegressor):
     regression_class = KNeighborsRegressor
@@ -352,7 +376,7 @@ def train_map_regressor(
     mainlog.debug(
         f"Training {regressor} on {int(training_fraction*len(map_target_values))} data-points"
     )
-    positions = np.vstack(map_phi, map_theta).T  # ready for sklearn now.
+    positions = np.column_stack((map_phi, map_theta))  # ready for sklearn now.
     positions_train, positions_test, values_train, values_test = train_test_split(
         positions,
         map_target_values,
@@ -4,7 +4,7 @@ Statistical Utility functions
 import numpy as np
 
 
-def uniform_sample_spherical(n_points):
+def uniform_sample_spherical(n_points, rng=None):
     r"""
     Return a uniform sample from a spherical surface.
 
@@ -12,6 +12,9 @@ def uniform_sample_spherical(n_points):
     ----------
     n_points: int
         The number of samples to draw.
+    rng: :py:class:`numpy.random.Generator` or int, optional
+        The random generator (or seed for a new one) to draw from. If ``None`` (default), the samples are drawn from
+        the global :py:mod:`numpy.random` state, so they can be reproduced with :py:func:`numpy.random.seed`.
 
     Returns
     -------
@@ -48,6 +51,52 @@ def uniform_sample_spherical(n_points):
 
         \cos \phi \sim U(N).
     """
-    return 2 * np.pi * np.random.uniform(0, 1, size=n_points), np.arccos(
-        2 * np.random.uniform(0, 1, size=n_points) - 1
-    )
+    rng = _get_rng(rng)
+
+    return 2 * np.pi * rng.random(n_points), np.arccos(2 * rng.random(n_points) - 1)
+
+
+def uniform_sample_lonlat(n_points, rng=None):
+    r"""
+    Return a uniform sample from a spherical surface in longitude / latitude.
+
+    Parameters
+    ----------
+    n_points: int
+        The number of samples to draw.
+    rng: :py:class:`numpy.random.Generator` or int, optional
+        The random generator (or seed for a new one) to draw from. If ``None`` (default), the samples are drawn from
+        the global :py:mod:`numpy.random` state, so they can be reproduced with :py:func:`numpy.random.seed`.
+
+    Returns
+    -------
+    lon
+        The longitudes (in rad), on :math:`[0, 2\pi)`.
+    lat
+        The latitudes (in rad), on :math:`[-\pi/2, \pi/2]`.
+
+    Notes
+    -----
+    This is equivalent to :py:func:`uniform_sample_spherical` with :math:`\delta = \pi/2 - \theta`. Since
+    :math:`\sin \delta = \cos \theta`, the latitude is drawn directly as :math:`\delta = \sin^{-1}(2u - 1)`, which
+    avoids converting from the elevation angle afterwards. Both arrays are computed in place.
+    """
+    rng = _get_rng(rng)
+
+    lon = rng.random(n_points)
+    lon *= 2 * np.pi
+
+    lat = rng.random(n_points)
+    lat *= 2
+    lat -= 1
+    np.arcsin(lat, out=lat)
+
+    return lon, lat
+
+
+def _get_rng(rng):
+    # The generator to draw from: the global numpy state by default (so np.random.seed applies), otherwise a Generator.
+    if rng is None:
+        return np.random
+
+    return np.random.default_rng(rng)
@@ -7,11 +7,14 @@ Notes
 For more information on databases, see :ref:`databases`.
 
 """
+import io
 import os
+import queue
 import threading
 import time
 import warnings
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from itertools import repeat
 from typing import Any, Callable, Generic, Type, TypeVar
 
@@ -20,7 +23,7 @@ import requests.exceptions
 import sqlalchemy as sql
 from astropy import units
 from astropy.coordinates import Angle, SkyCoord
-from astropy.table import Table, vstack
+from astropy.table import Column, Table
 from astroquery.ipac.ned import Ned
 from astroquery.simbad import Simbad
 from tqdm.auto import tqdm
@@ -28,9 +31,16 @@ from tqdm.contrib.logging import logging_redirect_tqdm
 
 from pyXMIP.schema import DEFAULT_SOURCE_SCHEMA_REGISTRY, SourceTableSchema
 from pyXMIP.structures.map import PoissonAtlas
-from pyXMIP.structures.table import SourceTable, correct_column_types
+from pyXMIP.structures.table import (
+    SourceTable,
+    correct_column_types,
+    count_table_types,
+    fast_vstack,
+)
 from pyXMIP.utilities.core import bin_directory, enforce_units
+from pyXMIP.utilities.geo import angular_separation
 from pyXMIP.utilities.logging import mainlog
+from pyXMIP.utilities.optimize import _RateLimiter
 from pyXMIP.utilities.types import Registry, convert_np_type_to_sql
 
 poisson_map_directory: str = os.path.join(bin_directory, "psn_maps")
@@ -70,6 +80,87 @@ class _DatabaseConfigSetting(Generic[Instance, Attribute, Value]):
         instance.query_config[self._name] = value
 
 
+def _canonical_query_region(
+    position: SkyCoord, radius: units.Quantity
+) -> tuple[SkyCoord, units.Quantity]:
+    # Astroquery caches responses on disk, keyed by the request parameters. Expressing every query in ICRS and
+    # rounding the position to ~microarcsecond and the radius to milliarcsecond precision ensures that (numerically)
+    # repeated queries produce identical requests and are served from that cache.
+    icrs = position.icrs
+    position = SkyCoord(
+        np.round(icrs.ra.deg, 10), np.round(icrs.dec.deg, 10), unit=units.deg
+    )
+    radius = np.round(radius.to_value(units.arcsec), 3) * units.arcsec
+    return position, radius
+
+
+def _query_key(position: SkyCoord, radius: units.Quantity) -> tuple[float, ...]:
+    # Key for the parsed query cache of a (canonical) query region.
+    return (
+        float(position.ra.deg),
+        float(position.dec.deg),
+        float(radius.to_value(units.arcsec)),
+    )
+
+
+def _cluster_query_regions(
+    ras: np.ndarray, decs: np.ndarray, radii: units.Quantity
+) -> list[np.ndarray]:
+    # Group query regions (RA / DEC in degrees) by the HEALPix pixel they fall in. The pixels are chosen to be at least
+    # as large as the largest radius, so the regions in each group overlap heavily. Returns the indices of each group.
+    import healpy as hp
+
+    _max_radius = np.amax(radii.to_value(units.rad), initial=0)
+    if _max_radius > 0:
+        _order = int(np.clip(np.floor(np.log2(hp.nside2resol(1) / _max_radius)), 0, 29))
+    else:
+        _order = 29
+
+    pixels = hp.ang2pix(2**_order, ras, decs, nest=True, lonlat=True)
+    _indices = np.argsort(pixels, kind="stable")
+    _, _starts = np.unique(pixels[_indices], return_index=True)
+    return np.split(_indices, _starts[1:])
+
+
+def _covering_query_region(
+    positions: SkyCoord, radii: units.Quantity
+) -> tuple[SkyCoord, units.Quantity]:
+    # A single region (about the mean direction of the positions) containing each of the (ICRS) query regions. It is
+    # padded by 1 mas so that rounding the region to its canonical form never shrinks it below the regions it covers.
+    _xyz = positions.cartesian.xyz.value.sum(axis=-1)
+    center = SkyCoord(
+        np.arctan2(_xyz[1], _xyz[0]),
+        np.arctan2(_xyz[2], np.hypot(_xyz[0], _xyz[1])),
+        unit=units.rad,
+        frame="icrs",
+    )
+    _separations = angular_separation(
+        center.ra.rad, center.dec.rad, positions.ra.rad, positions.dec.rad
+    )
+    radius = np.amax(_separations + radii.to_value(units.rad)) * units.rad
+    return center, (radius + 1 * units.mas).to(units.arcsec)
+
+
+def _sexagesimal_to_deg(values: Any, unit: str) -> np.ndarray:
+    # Vectorized equivalent of Angle(values, unit=unit).deg for space separated sexagesimal strings (SIMBAD's format).
+    # Numeric input is passed straight through Angle, which is already vectorized. Empty entries become NaN.
+    values = np.asarray(values)
+    if values.dtype.kind not in "US":
+        return Angle(values, unit=unit).deg
+
+    values = np.char.strip(values.astype("U"))
+    _head, _, _rest = np.char.partition(values, " ").T
+    _min, _, _sec = np.char.partition(np.char.strip(_rest), " ").T
+
+    _head = np.where(_head == "", "nan", _head).astype(float)
+    _min = np.where(_min == "", "0", _min).astype(float)
+    _sec = np.where(_sec == "", "0", np.char.strip(_sec)).astype(float)
+
+    _sign = np.where(np.char.startswith(values, "-"), -1.0, 1.0)
+    _deg = _sign * (np.abs(_head) + _min / 60 + _sec / 3600)
+    return _deg * 15 if units.Unit(unit) == units.hourangle else _deg
+
+
 class SourceDatabase(ABC):
     """
     Abstract class representation of a database class. All other database types are subclasses of this class.
@@ -99,7 +190,11 @@ class SourceDatabase(ABC):
 
     For local databases, this is automatically set to the base catalog. For remotes, it must generally be constructed.
     """
-    _thread_lock = threading.Lock()
+    query_chunksize: int = 1
+    """int: The number of positions handed to :py:meth:`SourceDatabase._query_radii` at once during counting.
+
+    Databases which can resolve many positions in a single request should raise this to batch their queries.
+    """
 
     def __init__(self, db_name: str, *args, **kwargs):
         """
@@ -170,6 +265,38 @@ class SourceDatabase(ABC):
         """
         pass
 
+    @staticmethod
+    def clear_cache():
+        """Clear any cached query results held by this database."""
+        pass
+
+    def _query_radii(
+        self, positions: SkyCoord, radii: units.Quantity
+    ) -> list[SourceTable | None]:
+        """
+        DEVELOPERS: Query a batch of positions, returning one table per position (``None`` if that query failed).
+
+        By default, this simply runs :py:meth:`SourceDatabase._query_radius` for each position. Databases which support
+        batched (vector) queries should override it.
+        """
+        output = []
+        for position, radius in zip(positions, radii):
+            try:
+                output.append(self._query_radius(position, radius))
+            except Exception as exception:
+                mainlog.error(exception.__repr__())
+                output.append(None)
+
+        return output
+
+    def _configure_threads(self, max_workers: int | None):
+        """
+        DEVELOPERS: Prepare the database to be queried from ``max_workers`` threads at once.
+
+        By default, this does nothing.
+        """
+        pass
+
     def query_radius(self, position: SkyCoord, radius: units.Quantity) -> SourceTable:
         """
         Query the remote database at the specified position and pull all sources within a given radius.
@@ -295,13 +422,16 @@ class SourceDatabase(ABC):
 
         Parameters
         ----------
-        positions: list of SkyCoord
-            A list of sky coordinates to query at.
+        positions: SkyCoord or list of SkyCoord
+            The sky coordinates to query at. A list of coordinates is combined into a single (vector) :py:class:`SkyCoord`.
         radii: units.Quantity
             An array of the same size as ``positions`` containing the sample radii.
         parallel_kwargs: dict
             Parameters for parallelization. For more information see :ref:`parallelization`.
 
+            In addition to the threading parameters, ``chunksize`` may be specified to set the number of positions
+            queried together (default :py:attr:`SourceDatabase.query_chunksize`).
+
             .. note::
 
                 This method implements multi-threading in some subclasses.
@@ -310,15 +440,31 @@ class SourceDatabase(ABC):
         -------
         Table
             A table containing counts for each of the object types and the positions of queries.
+            Positions for which the query failed are omitted.
         """
         from pyXMIP.utilities.optimize import map_to_threads
 
         # -------------------------------------------#
         # Managing args / kwargs and paths
         # -------------------------------------------#
+        # Everything downstream works on a single vector SkyCoord (sliced per chunk and transformed as a whole).
+        if not isinstance(positions, SkyCoord):
+            positions = SkyCoord(positions)
+        if positions.isscalar:
+            positions = positions.reshape((1,))
+        # Transform to ICRS once here; each query canonicalises to ICRS and a per-position frame transform
+        # costs roughly ten times more than the (identity) ICRS case.
+        positions = positions.icrs
+
         radii = enforce_units(radii, units.arcmin)
         if radii.isscalar:
-            radii = radii * np.ones(len(positions))
+            # read-only view of the single radius; no need to materialize a constant array.
+            radii = np.broadcast_to(radii, (len(positions),), subok=True)
+
+        parallel_kwargs = {} if parallel_kwargs is None else dict(parallel_kwargs)
+        chunksize = parallel_kwargs.pop("chunksize", self.query_chunksize)
+        chunks = [slice(i, i + chunksize) for i in range(0, len(positions), chunksize)]
+        self._configure_threads(parallel_kwargs.get("max_workers", 1))
         # ------------------------------------------------ #
         # Running the queries through the database         #
         # ------------------------------------------------ #
@@ -326,38 +472,72 @@ class SourceDatabase(ABC):
             info=0
         ), warnings.catch_warnings():
             warnings.simplefilter("ignore")
-            pbar = tqdm(zip(positions, radii), total=len(radii))
+            pbar = tqdm(total=len(radii))
             results = map_to_threads(
                 self._thread_pooled_count,
-                positions,
-                radii,
+                [positions[chunk] for chunk in chunks],
+                [radii[chunk] for chunk in chunks],
                 repeat(pbar),
                 threading_kw=parallel_kwargs,
             )
+            _success, _counts = zip(*results)
+            _success = np.concatenate(_success)
 
             output_table = correct_column_types(
-                vstack([k for k in results if k is not None])
+                fast_vstack([k for k in _counts if k is not None])
             )
 
-        output_table["RA"] = [p.icrs.ra for p in positions]
-        output_table["DEC"] = [p.icrs.dec for p in positions]
-        output_table["RAD"] = radii
-        output_table["TIME"] = time.asctime()
+        output_table["RA"] = Column(positions.ra.deg[_success], unit=units.deg)
+        output_table["DEC"] = Column(positions.dec.deg[_success], unit=units.deg)
+        output_table["RAD"] = Column(radii[_success].value, unit=radii.unit)
+        output_table["TIME"] = Column(np.full(len(output_table), time.asctime()))
         return output_table
 
     def _thread_pooled_count(
-        self, position: SkyCoord, radius: units.Quantity, progress_bar: Any
-    ) -> Table:
+        self, positions: SkyCoord, radii: units.Quantity, progress_bar: Any
+    ) -> tuple[np.ndarray, Table | None]:
+        # Returns a mask of the positions whose queries succeeded and the count table (one row for each of them).
         try:
-            _output_var = self.query_radius(position, radius).count_types()
+            queries = self._query_radii(positions, radii)
         except Exception as exception:
             mainlog.error(exception.__repr__())
-            _output_var = None
-        progress_bar.update()
-        return _output_var
+            queries = [None] * len(positions)
+
+        # -- resolve the TYPE column once; every query in the chunk shares the query schema -- #
+        _type_column = self.query_schema.TYPE
+
+        _success = np.zeros(len(positions), dtype=bool)
+        for i, query in enumerate(queries):
+            if query is None:
+                continue
+            elif _type_column not in query.columns:
+                mainlog.error(
+                    f"Cannot count types because there is no TYPE column {_type_column}."
+                )
+                continue
+
+            _success[i] = True
+
+        # -- count the whole chunk at once -- #
+        try:
+            _counts = (
+                count_table_types([q for q, k in zip(queries, _success) if k])
+                if _success.any()
+                else None
+            )
+        except Exception as exception:
+            mainlog.error(exception.__repr__())
+            _success[:], _counts = False, None
+
+        progress_bar.update(len(positions))
+        return _success, _counts
 
     def random_sample_count(
-        self, points: int, radii: units.Quantity, parallel_kwargs: Any = None
+        self,
+        points: int,
+        radii: units.Quantity,
+        parallel_kwargs: Any = None,
+        rng: Any = None,
     ) -> Table:
         """
         Count the number of instances of each object type at each of a number of random positions on the sky.
@@ -374,29 +554,31 @@ class SourceDatabase(ABC):
             .. note::
 
                 This method implements multi-threading in some subclasses.
+        rng: :py:class:`numpy.random.Generator` or int, optional
+            The random generator (or seed) to draw the positions from. By default, the global :py:mod:`numpy.random`
+            state is used.
 
         Returns
         -------
         Table
             Table of counts for each of the object types.
         """
-        from pyXMIP.stats.utilities import uniform_sample_spherical
+        from pyXMIP.stats.utilities import uniform_sample_lonlat
 
         mainlog.info(f"Querying for {points} random counts on {self.name}.")
 
         # -------------------------------------------#
         # Managing args / kwargs and paths
         # -------------------------------------------#
+        # scalar radii are broadcast (without copying) in count.
         radii = enforce_units(radii, units.arcmin)
-        if radii.isscalar:
-            radii = radii * np.ones(points)
 
         # -------------------------------------------#
         # Pull the random samples
         # -------------------------------------------#
-        phi, theta = uniform_sample_spherical(points)
-        theta = np.pi / 2 - theta
-        positions = SkyCoord(phi, theta, frame="galactic", unit="rad")
+        # The sample is isotropic in any frame, so it's drawn directly in ICRS to avoid transforming it for the queries.
+        lon, lat = uniform_sample_lonlat(points, rng=rng)
+        positions = SkyCoord(lon, lat, frame="icrs", unit=units.rad)
 
         return self.count(positions, radii, parallel_kwargs=parallel_kwargs)
 
@@ -436,7 +618,11 @@ class SourceDatabase(ABC):
         self._poisson_atlas_path = value
 
     def add_sources_to_poisson(
-        self, points: int, radii: units.Quantity, parallel_kwargs: dict = None
+        self,
+        points: int,
+        radii: units.Quantity,
+        parallel_kwargs: dict = None,
+        rng: Any = None,
     ):
         """
         Add randomly sampled sources to the Poisson-atlas of this database instance.
@@ -453,10 +639,13 @@ class SourceDatabase(ABC):
             .. note::
 
                 This method implements multi-threading in some subclasses.
+        rng: :py:class:`numpy.random.Generator` or int, optional
+            The random generator (or seed) to draw the positions from. By default, the global :py:mod:`numpy.random`
+            state is used.
         """
         mainlog.info(f"Generating random sample of {points} counts.")
         point_data = self.random_sample_count(
-            points, radii, parallel_kwargs=parallel_kwargs
+            points, radii, parallel_kwargs=parallel_kwargs, rng=rng
         )
 
         mainlog.info(f"Adding data to the Poisson map at {self._poisson_atlas_path}.")
@@ -545,9 +734,12 @@ class LocalDatabase(SourceDatabase):
             other_positions[idxother].ra.deg,
             other_positions[idxother].dec.deg,
         )
-        matched_table["CATNMATCH"] = [
-            len(list(set(idxself[idxother == idxo]))) for idxo in idxother
-        ]
+        # The number of distinct database objects matched to each catalog source. The (source, object) pairs are
+        # deduplicated once and counted per source, instead of masking the full match list for every row.
+        _unique_pairs = np.unique(np.stack((idxother, idxself)), axis=1)
+        matched_table["CATNMATCH"] = np.bincount(
+            _unique_pairs[0], minlength=len(source_table)
+        )[idxother]
 
         return matched_table
 
@@ -587,7 +779,14 @@ class LocalDatabase(SourceDatabase):
     def _query_radius(self, position, radius):
         # -- Pull the matches -- #
         positions = self.table.get_coordinates()
-        return self.table[positions.separation(position) < radius]
+        position = position.transform_to(positions.frame)
+        _separations = angular_separation(
+            positions.spherical.lon.rad,
+            positions.spherical.lat.rad,
+            position.spherical.lon.rad,
+            position.spherical.lat.rad,
+        )
+        return self.table[_separations < radius.to_value(units.rad)]
 
 
 class RemoteDatabase(SourceDatabase, ABC):
@@ -595,12 +794,313 @@ class RemoteDatabase(SourceDatabase, ABC):
     Generic class representation of a source database.
     """
 
+    POOL_SIZE = _DatabaseConfigSetting(default=32)
+    """
+    int: The maximum number of keep-alive connections held open to the remote service.
+
+    This should be at least the number of threads used to query the database. Default is ``32``.
+    """
+    MAX_RETRIES = _DatabaseConfigSetting(default=3)
+    """
+    int: The number of times a failed connection (or a ``429``, ``502``, ``503`` or ``504`` response) is retried.
+
+    Retries back off exponentially (honoring any ``Retry-After`` header). Default is ``3``.
+    """
+    MAX_REQUEST_RATE = _DatabaseConfigSetting(default=None)
+    """
+    float: The maximum (sustained) number of requests per second made to the remote service, shared between all of
+    the query threads. Requests beyond this rate wait for their turn instead of being throttled by the service.
+
+    If ``None`` (default), the request rate isn't limited.
+    """
+    REQUEST_BURST = _DatabaseConfigSetting(default=10)
+    """
+    int: The number of requests which may be made at once (before :py:attr:`RemoteDatabase.MAX_REQUEST_RATE`
+    applies). Default is ``10``.
+    """
+    QUERY_CACHE_SIZE = _DatabaseConfigSetting(default=1024)
+    """
+    int: The number of parsed query results to keep in memory, so that repeated queries skip both the request and
+    the parsing of its response.
+
+    Set to ``0`` to disable. Default is ``1024``.
+    """
+    DISK_CACHE = _DatabaseConfigSetting(default=False)
+    """
+    bool: If ``True``, parsed query results are also stored in an on-disk (SQLite) cache in
+    :py:attr:`RemoteDatabase.DISK_CACHE_DIRECTORY`, so that repeated queries are served without a request in later
+    sessions as well.
+
+    Cached results older than :py:attr:`RemoteDatabase.DISK_CACHE_TTL` are re-queried and the least recently used
+    results beyond :py:attr:`RemoteDatabase.DISK_CACHE_SIZE` are discarded. If the directory isn't writable, the disk
+    cache is skipped (with a warning). Use :py:meth:`RemoteDatabase.clear_query_cache` to empty it. Default is
+    ``False``.
+    """
+    DISK_CACHE_DIRECTORY = _DatabaseConfigSetting(default=None)
+    """
+    str: The directory holding the on-disk query cache. If ``None`` (default), the ``query_cache`` directory in the
+    user's ``pyXMIP`` cache directory (see :py:func:`astropy.config.get_cache_dir`) is used.
+    """
+    DISK_CACHE_TTL = _DatabaseConfigSetting(default=7 * 24 * 3600)
+    """
+    float: The time (in seconds) for which results in the on-disk query cache are considered valid. Default is one
+    week.
+    """
+    DISK_CACHE_SIZE = _DatabaseConfigSetting(default=100000)
+    """
+    int: The maximum number of query results kept in the on-disk query cache. Default is ``100000``.
+    """
+    WRITE_QUEUE_SIZE = _DatabaseConfigSetting(default=256)
+    """
+    int: The maximum number of matched queries held in memory waiting to be written during :py:meth:`source_match`.
+
+    Default is ``256``.
+    """
+    CLUSTER_QUERIES = _DatabaseConfigSetting(default=False)
+    """
+    bool: If ``True``, sources in :py:meth:`source_match` which fall in the same HEALPix pixel (no smaller than the
+    search radius) share a single query covering all of their search regions. The matches for each source are then
+    selected locally.
+
+    This cuts the number of requests for dense catalogs, but the covering queries are much larger than the individual
+    search regions. If a covering query hits a row limit of the service, its sources are queried individually
+    instead. Default is ``False``.
+    """
+
     def __init__(self, db_name, **kwargs):
         super().__init__(db_name, **kwargs)
 
+        # -- sessions configured by _configure_session (id -> (session, pool size)) -- #
+        self._sessions: dict[int, tuple[requests.Session, int]] = {}
+        self._rate_limiter: _RateLimiter | None = None
+
+        # -- parsed query cache -- #
+        self._query_cache: OrderedDict[tuple, SourceTable] = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self._disk_cache_engine: tuple[str, sql.Engine | None] | None = None
+
     def __str__(self):
         return f"<RemoteDatabase {self.name}>"
 
+    @property
+    def _disk_cache_path(self) -> str:
+        # The path of the SQLite database holding this database's on-disk query cache.
+        _directory = self.DISK_CACHE_DIRECTORY
+        if _directory is None:
+            from astropy.config import get_cache_dir
+
+            _directory = os.path.join(
+                get_cache_dir("pyXMIP", ensure_exists=False), "query_cache"
+            )
+
+        return os.path.join(_directory, f"{self.name}.db")
+
+    @property
+    def _disk_cache(self) -> sql.Engine | None:
+        # The (lazily created) engine of the on-disk query cache, or None if it can't be used. Queries are keyed by
+        # their canonical region and stored as ECSV, which keeps the column types and masks.
+        with self._query_cache_lock:
+            _path = self._disk_cache_path
+            if (
+                self._disk_cache_engine is not None
+                and self._disk_cache_engine[0] == _path
+            ):
+                return self._disk_cache_engine[1]
+
+            try:
+                os.makedirs(os.path.dirname(_path), exist_ok=True)
+                if not os.access(os.path.dirname(_path), os.W_OK):
+                    raise PermissionError(f"{os.path.dirname(_path)} isn't writable.")
+
+                engine = sql.create_engine(
+                    f"sqlite:///{_path}",
+                    connect_args={"timeout": 30, "check_same_thread": False},
+                )
+                with engine.begin() as conn:
+                    conn.execute(
+                        sql.text(
+                            "CREATE TABLE IF NOT EXISTS QUERIES (RA REAL, DEC REAL, RAD REAL, DATA TEXT, "
+                            "CTIME REAL, ATIME REAL, PRIMARY KEY (RA, DEC, RAD))"
+                        )
+                    )
+            except Exception as exception:
+                mainlog.warning(
+                    f"The on-disk query cache at {_path} can't be used; it is skipped. ({exception})"
+                )
+                engine = None
+
+            self._disk_cache_engine = (_path, engine)
+
+        return engine
+
+    def clear_query_cache(self):
+        """
+        Clear the parsed query results held (in memory and on disk) by this database.
+
+        Notes
+        -----
+        This doesn't clear the cache of the underlying ``astroquery`` service; see ``clear_cache``.
+        """
+        with self._query_cache_lock:
+            self._query_cache.clear()
+
+        if os.path.exists(self._disk_cache_path) and self._disk_cache is not None:
+            with self._disk_cache.begin() as conn:
+                conn.execute(sql.text("DELETE FROM QUERIES"))
+
+    def _get_cached_query(self, key: tuple) -> SourceTable | None:
+        # Return a copy of the cached query (callers alter their results) or None if it isn't cached.
+        with self._query_cache_lock:
+            if key in self._query_cache:
+                self._query_cache.move_to_end(key)
+                return self._query_cache[key].copy()
+
+        if not self.DISK_CACHE or (engine := self._disk_cache) is None:
+            return None
+
+        _key = dict(zip(("ra", "dec", "rad"), key))
+        try:
+            with engine.begin() as conn:
+                row = conn.execute(
+                    sql.text(
+                        "SELECT DATA, CTIME FROM QUERIES WHERE RA = :ra AND DEC = :dec AND RAD = :rad"
+                    ),
+                    _key,
+                ).fetchone()
+
+                if row is None:
+                    return None
+                elif time.time() - row[1] > self.DISK_CACHE_TTL:
+                    # expired; it gets replaced once it has been queried again.
+                    return None
+
+                conn.execute(
+                    sql.text(
+                        "UPDATE QUERIES SET ATIME = :atime WHERE RA = :ra AND DEC = :dec AND RAD = :rad"
+                    ),
+                    {**_key, "atime": time.time()},
+                )
+
+            query = SourceTable(Table.read(row[0], format="ascii.ecsv"))
+        except Exception as exception:
+            mainlog.debug(f"Failed to read {key} from the query cache: {exception}")
+            return None
+
+        query.schema = self.query_schema
+        self._set_memory_cached_query(key, query)
+        return query
+
+    def _set_cached_query(self, key: tuple, query: SourceTable):
+        self._set_memory_cached_query(key, query)
+
+        if not self.DISK_CACHE or (engine := self._disk_cache) is None:
+            return
+
+        try:
+            buffer = io.StringIO()
+            _table = Table(query, copy=False)
+            _table.meta = {}
+            _table.write(buffer, format="ascii.ecsv")
+
+            _time = time.time()
+            with engine.begin() as conn:
+                conn.execute(
+                    sql.text(
+                        "INSERT OR REPLACE INTO QUERIES (RA, DEC, RAD, DATA, CTIME, ATIME) "
+                        "VALUES (:ra, :dec, :rad, :data, :time, :time)"
+                    ),
+                    {
+                        **dict(zip(("ra", "dec", "rad"), key)),
+                        "data": buffer.getvalue(),
+                        "time": _time,
+                    },
+                )
+
+                # -- drop the expired and least recently used results beyond DISK_CACHE_SIZE -- #
+                conn.execute(
+                    sql.text("DELETE FROM QUERIES WHERE CTIME < :expiry"),
+                    {"expiry": _time - self.DISK_CACHE_TTL},
+                )
+                _excess = (
+                    conn.execute(sql.text("SELECT COUNT(*) FROM QUERIES")).scalar()
+                    - self.DISK_CACHE_SIZE
+                )
+                if _excess > 0:
+                    conn.execute(
+                        sql.text(
+                            "DELETE FROM QUERIES WHERE rowid IN "
+                            "(SELECT rowid FROM QUERIES ORDER BY ATIME LIMIT :excess)"
+                        ),
+                        {"excess": _excess},
+                    )
+        except Exception as exception:
+            mainlog.debug(f"Failed to write {key} to the query cache: {exception}")
+
+    def _set_memory_cached_query(self, key: tuple, query: SourceTable):
+        if self.QUERY_CACHE_SIZE <= 0:
+            return
+
+        with self._query_cache_lock:
+            self._query_cache[key] = query.copy()
+            self._query_cache.move_to_end(key)
+
+            while len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+
+    def _query_truncated(self, query: Table) -> bool:
+        # True if the service may have cut off the rows of ``query`` (i.e. it hit a row limit). Services without a
+        # row limit never truncate.
+        _ = query
+        return False
+
+    def _wait_for_request(self):
+        # Block until a request to the remote service is allowed by MAX_REQUEST_RATE.
+        if self.MAX_REQUEST_RATE is None:
+            return
+
+        _limiter = self._rate_limiter
+        if (
+            _limiter is None
+            or _limiter.rate != self.MAX_REQUEST_RATE
+            or _limiter.burst != self.REQUEST_BURST
+        ):
+            with self._query_cache_lock:
+                if self._rate_limiter is _limiter:
+                    self._rate_limiter = _RateLimiter(
+                        self.MAX_REQUEST_RATE, self.REQUEST_BURST
+                    )
+                _limiter = self._rate_limiter
+
+        _limiter.acquire()
+
+    def _configure_session(self, session: requests.Session, pool_size: int = None):
+        # Mount a pooled adapter on the (astroquery) session so that all of the query threads share keep-alive
+        # connections and transient connection failures are retried rather than dropping the query.
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self._sessions[id(session)] = session, pool_size or self.POOL_SIZE
+        adapter = HTTPAdapter(
+            pool_maxsize=pool_size or self.POOL_SIZE,
+            max_retries=Retry(
+                total=self.MAX_RETRIES,
+                backoff_factor=0.5,
+                status_forcelist=(429, 502, 503, 504),
+            ),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def _configure_threads(self, max_workers: int | None):
+        # Grow the connection pools if there are more threads than connections; otherwise, connections are discarded
+        # and re-opened (with a new TLS handshake) as the threads compete for them.
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+        for session, pool_size in list(self._sessions.values()):
+            if max_workers > pool_size:
+                self._configure_session(session, pool_size=max_workers)
+
     def source_match(
         self, path, source_table, search_radii=1 * units.arcmin, parallel_kwargs=None
     ):
@@ -621,6 +1121,11 @@ class RemoteDatabase(SourceDatabase, ABC):
         Returns
         -------
         None
+
+        Raises
+        ------
+        DatabaseError
+            If the matches couldn't be written to the database at ``path``.
         """
         import sqlalchemy as sql
 
@@ -640,78 +1145,200 @@ class RemoteDatabase(SourceDatabase, ABC):
             search_radii = np.array(search_radii) * units.arcmin
 
         if search_radii.isscalar:
-            search_radii = search_radii * np.ones(len(source_table))
+            # read-only view of the single radius; no need to materialize a constant array.
+            search_radii = np.broadcast_to(
+                search_radii, (len(source_table),), subok=True
+            )
 
         # ---------------------------------------------------#
         # Running queries
         # ---------------------------------------------------#
-        positions = source_table.get_coordinates()
-
-        with logging_redirect_tqdm(loggers=[mainlog]):
-            pbar = tqdm(desc=f"Querying {self.name}", total=len(search_radii))
-            # -- Run once without pass to threads -- #
-            result = map_to_threads(
-                self._thread_pooled_source_match,
-                positions,
-                source_table,
-                repeat(source_table.schema),
-                search_radii,
-                repeat(pbar),
-                repeat(engine),
-                threading_kw=parallel_kwargs,
-            )
+        if parallel_kwargs is not None:
+            self._configure_threads(parallel_kwargs.get("max_workers", 1))
 
-            for _ in result:
-                pass
+        # Transform all of the positions at once; the workers also get their coordinates as plain floats.
+        positions = source_table.get_coordinates().icrs
+        _ras, _decs = positions.ra.deg, positions.dec.deg
+        _names = source_table[source_table.schema.NAME]
+
+        # Sources are matched in groups; each group costs a single query.
+        if self.CLUSTER_QUERIES:
+            groups = _cluster_query_regions(_ras, _decs, search_radii)
+        else:
+            groups = np.arange(len(positions)).reshape((-1, 1))
+
+        # Workers hand their results to a single writer thread, which batches them into the database while the
+        # remaining queries are still in flight.
+        write_queue, write_errors = queue.Queue(maxsize=self.WRITE_QUEUE_SIZE), []
+        writer = threading.Thread(
+            target=self._sql_writer,
+            args=(
+                engine,
+                write_queue,
+                sql.inspect(engine).has_table(f"{self.name}_MATCH"),
+                write_errors,
+            ),
+            name=f"{self.name}_MATCH_writer",
+        )
+        writer.start()
+
+        try:
+            with logging_redirect_tqdm(loggers=[mainlog]):
+                pbar = tqdm(desc=f"Querying {self.name}", total=len(search_radii))
+                # -- Run once without pass to threads -- #
+                map_to_threads(
+                    self._thread_pooled_source_match,
+                    (positions[group] for group in groups),
+                    (_ras[group] for group in groups),
+                    (_decs[group] for group in groups),
+                    (_names[group] for group in groups),
+                    (search_radii[group] for group in groups),
+                    repeat(pbar),
+                    repeat(write_queue),
+                    threading_kw=parallel_kwargs,
+                )
+        finally:
+            write_queue.put(None)
+            writer.join()
+
+        if write_errors:
+            raise DatabaseError(
+                f"Failed to write the matches to {self.name}_MATCH in {path}."
+            ) from write_errors[0]
 
     def _thread_pooled_source_match(
         self,
-        position,
-        source_table_entry,
-        source_table_schema,
-        search_radius,
+        positions,
+        ras,
+        decs,
+        source_names,
+        search_radii,
         pbar,
-        engine,
+        write_queue,
     ):
+        # Match a group of sources. A single source is queried directly, otherwise one query covers the whole group
+        # and each source keeps the rows within its own search radius.
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
             try:
-                query = self.correct_query_output(
-                    self._query_radius(position, search_radius)
-                )
-                if not len(query):
-                    pbar.update()
-                    return None
+                if len(positions) == 1:
+                    queries = [
+                        self.correct_query_output(
+                            self._query_radius(positions[0], search_radii[0])
+                        )
+                    ]
+                else:
+                    query = self.correct_query_output(
+                        self._query_radius(
+                            *_covering_query_region(positions, search_radii)
+                        )
+                    )
 
-                query["CATOBJ"] = source_table_entry[source_table_schema.NAME]
-                query["CATRA"] = position.ra.deg
-                query["CATDEC"] = position.dec.deg
-                query["CATNMATCH"] = len(query)
-                query.meta = {}
-                pbar.update()
+                    if self._query_truncated(query):
+                        # the covering query may be missing matches; query each of the sources on its own instead.
+                        queries = [
+                            self.correct_query_output(self._query_radius(p, r))
+                            for p, r in zip(positions, search_radii)
+                        ]
+                    else:
+                        _coordinates = query.get_coordinates().icrs
+                        _lon, _lat = _coordinates.ra.rad, _coordinates.dec.rad
+                        queries = [
+                            query[angular_separation(_lon, _lat, _ra, _dec) < radius]
+                            for _ra, _dec, radius in zip(
+                                np.deg2rad(ras),
+                                np.deg2rad(decs),
+                                search_radii.to_value(units.rad),
+                            )
+                        ]
+
+                for query, source_name, _ra, _dec in zip(
+                    queries, source_names, ras, decs
+                ):
+                    if len(query):
+                        query["CATOBJ"] = source_name
+                        query["CATRA"] = _ra
+                        query["CATDEC"] = _dec
+                        query["CATNMATCH"] = len(query)
+                        query.meta = {}
+                        write_queue.put(query)
             except Exception as exception:
                 mainlog.error(exception.__repr__())
-                return None
+            finally:
+                # exactly one (rate limited) update per group, whether or not the query succeeded.
+                pbar.update(len(positions))
 
-            with self._thread_lock:
-                if not sql.inspect(engine).has_table(f"{self.name}_MATCH"):
-                    mainlog.info(
-                        f"[{threading.current_thread().name}] Creating table {self.name}_MATCH schema."
-                    )
-                    metadata = sql.MetaData()
-                    _ = sql.Table(
-                        f"{self.name}_MATCH",
-                        metadata,
-                        *[
-                            sql.Column(k, convert_np_type_to_sql(v))
-                            for k, v in dict(query.to_pandas().dtypes).items()
-                        ],
-                    )
-                    metadata.create_all(engine)
+        return None
 
-                query.append_to_sql(f"{self.name}_MATCH", engine, method="multi")
+    def _sql_writer(self, engine, write_queue, table_ready, errors, batch_size=1000):
+        # Consume matched queries from ``write_queue`` (until ``None`` is received) and write them to the match table.
+        # Everything already waiting in the queue (up to ``batch_size`` rows) is written in a single transaction. If a
+        # write fails, the exception is added to ``errors`` for the calling thread to raise and the rest of the queue
+        # is drained without writing (so that the workers never block on a full queue).
+        table_name = f"{self.name}_MATCH"
+        table = None
+        finished = False
+
+        while not finished:
+            batch, n_rows = [write_queue.get()], 0
+            while batch[-1] is not None and n_rows < batch_size:
+                n_rows += len(batch[-1])
+                try:
+                    batch.append(write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if batch[-1] is None:
+                finished = True
+                batch.pop()
+
+            if not batch or errors:
+                continue
 
-        return None
+            try:
+                with engine.begin() as conn:
+                    _table = table
+                    if _table is None and table_ready:
+                        _table = sql.Table(
+                            table_name, sql.MetaData(), autoload_with=conn
+                        )
+                    elif _table is None:
+                        mainlog.info(
+                            f"[{threading.current_thread().name}] Creating table {table_name} schema."
+                        )
+                        _table = sql.Table(
+                            table_name,
+                            sql.MetaData(),
+                            *[
+                                sql.Column(k, convert_np_type_to_sql(v))
+                                for k, v in dict(batch[0].to_pandas().dtypes).items()
+                            ],
+                        )
+                        _table.create(conn)
+
+                    # -- one executemany for each distinct set of columns -- #
+                    # Masked entries become None (NULL) through tolist().
+                    rows = {}
+                    for query in batch:
+                        _colnames = tuple(query.colnames)
+                        rows.setdefault(_colnames, []).extend(
+                            dict(zip(_colnames, row))
+                            for row in zip(*[query[k].tolist() for k in _colnames])
+                        )
+
+                    for _colnames, _rows in rows.items():
+                        # insert() silently skips unknown keys; those columns would be lost.
+                        if _missing := set(_colnames).difference(_table.columns.keys()):
+                            raise DatabaseError(
+                                f"Columns {sorted(_missing)} are not in the match table {table_name}."
+                            )
+
+                        conn.execute(sql.insert(_table), _rows)
+
+                table, table_ready = _table, True
+            except Exception as exception:
+                mainlog.error(exception.__repr__())
+                errors.append(exception)
 
 
 class NED(RemoteDatabase):
@@ -752,6 +1379,12 @@ class NED(RemoteDatabase):
 
     def config_ned(self):
         Ned.TIMEOUT = self.TIMEOUT
+        self._configure_session(Ned._session)
+
+    @staticmethod
+    def clear_cache():
+        """Clear the cache associated with NED queries."""
+        Ned.clear_cache()
 
     @classmethod
     def _default_correct_query_output(cls, table, schema=None):
@@ -779,8 +1412,13 @@ class NED(RemoteDatabase):
         -------
         :py:class:`astropy.table.Table`
         """
+        position, radius = _canonical_query_region(position, radius)
+        if (output := self._get_cached_query(_query_key(position, radius))) is not None:
+            return output
+
         # -- Attempt the query -- #
         try:
+            self._wait_for_request()
             output = SourceTable(Ned.query_region(position, radius))
         except requests.exceptions.ConnectionError:
             raise DatabaseError(
@@ -789,6 +1427,7 @@ class NED(RemoteDatabase):
 
         # -- return data if valid -- #
         output.schema = self.query_schema
+        self._set_cached_query(_query_key(position, radius), output)
         return output
 
     def query_object(self, object_name):
@@ -902,10 +1541,14 @@ class SIMBAD(RemoteDatabase):
 
     Default is ``0``, which allows for all results.
     """
+    query_chunksize = 50
 
     def __init__(self, name="SIMBAD_STD", **kwargs):
         super().__init__(name, **kwargs)
 
+        # -- disabled if the query output can't be split by position (see _query_radii) -- #
+        self._batch_queries = True
+
         self.config_simbad()
 
     @property
@@ -935,16 +1578,17 @@ class SIMBAD(RemoteDatabase):
     def config_simbad(self):
         Simbad.TIMEOUT = self.TIMEOUT
         Simbad.ROW_LIMIT = self.ROW_LIMIT
+        self._configure_session(Simbad._session)
         Simbad.add_votable_fields(*self.EXTRA_COLUMNS)
         Simbad.remove_votable_fields(*self.REMOVED_COLUMNS)
 
     @classmethod
     def _default_correct_query_output(cls, table: SourceTable, schema=None):
         if "RA" in table.columns:
-            table["RA"] = Angle(table["RA"], unit="h").deg
+            table["RA"] = _sexagesimal_to_deg(table["RA"], "hourangle")
 
         if "DEC" in table.columns:
-            table["DEC"] = Angle(table["DEC"], unit="deg").deg
+            table["DEC"] = _sexagesimal_to_deg(table["DEC"], "deg")
 
         table = super()._default_correct_query_output(table, schema=schema)
 
@@ -963,8 +1607,13 @@ class SIMBAD(RemoteDatabase):
         -------
         :py:class:`astropy.table.Table`
         """
+        position, radius = _canonical_query_region(position, radius)
+        if (output := self._get_cached_query(_query_key(position, radius))) is not None:
+            return output
+
         # -- Attempt the query -- #
         try:
+            self._wait_for_request()
             output = SourceTable(Simbad.query_region(position, radius))
         except requests.exceptions.ConnectionError:
             raise DatabaseError(
@@ -973,8 +1622,108 @@ class SIMBAD(RemoteDatabase):
 
         # -- return data if valid -- #
         output.schema = self.query_schema
+        self._set_cached_query(_query_key(position, radius), output)
         return output
 
+    def _query_radii(
+        self, positions: SkyCoord, radii: units.Quantity
+    ) -> list[SourceTable | None]:
+        # SIMBAD resolves a vector of positions (each with its own radius) in a single TAP query. The union of the
+        # cones comes back as one table, so the rows are tied back to each input position by their separation from it.
+        positions, radii = _canonical_query_region(positions, radii)
+        _keys = list(
+            zip(
+                positions.ra.deg.tolist(),
+                positions.dec.deg.tolist(),
+                radii.to_value(units.arcsec).tolist(),
+            )
+        )
+
+        # -- only the positions which aren't cached are queried -- #
+        output = [self._get_cached_query(key) for key in _keys]
+        _missing = np.flatnonzero([query is None for query in output])
+
+        if len(_missing) > 1 and self._batch_queries:
+            try:
+                self._wait_for_request()
+                result = Simbad.query_region(positions[_missing], radii[_missing])
+            except requests.exceptions.ConnectionError:
+                mainlog.error(
+                    f"Failed to complete {len(_missing)} queries to Simbad due to timeout."
+                )
+                return output
+
+            if result is None:
+                # Nothing at any of the positions; keep the TYPE column so that each position counts as empty.
+                result = Table(names=[self.query_schema.TYPE], dtype=[str])
+
+            _coordinates = self._get_row_coordinates(result) if len(result) else None
+
+            if len(result) and _coordinates is None:
+                # We can't attribute the rows to their positions; revert to single queries from here on.
+                mainlog.warning(
+                    "Simbad query output has no usable coordinate columns; batched queries are disabled."
+                )
+                self._batch_queries = False
+            elif self._query_truncated(result):
+                # The union was (probably) truncated by ROW_LIMIT; each position has to be queried on its own.
+                mainlog.debug(
+                    f"Batched Simbad query hit ROW_LIMIT={self.ROW_LIMIT}; reverting to single queries."
+                )
+            else:
+                self._split_batched_query(
+                    result, _coordinates, positions, radii, _missing, _keys, output
+                )
+                return output
+
+        # -- single queries (one position left, batching disabled or a batch which couldn't be used) -- #
+        for i, query in zip(
+            _missing, super()._query_radii(positions[_missing], radii[_missing])
+        ):
+            output[i] = query
+
+        return output
+
+    def _query_truncated(self, query: Table) -> bool:
+        return bool(self.ROW_LIMIT) and len(query) >= self.ROW_LIMIT
+
+    def _get_row_coordinates(
+        self, table: Table
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        # RA / DEC (radians) of the rows of a raw Simbad query. TAP (astroquery >= 0.4.8) returns ``ra`` / ``dec`` in
+        # degrees; older versions return the schema's decimal columns and / or sexagesimal RA / DEC.
+        for ra, dec, unit in (
+            (self.query_schema.RA, self.query_schema.DEC, "deg"),
+            ("ra", "dec", "deg"),
+            ("RA", "DEC", "hourangle"),
+        ):
+            if ra in table.columns and dec in table.columns:
+                return (
+                    np.deg2rad(_sexagesimal_to_deg(table[ra], unit)),
+                    np.deg2rad(_sexagesimal_to_deg(table[dec], "deg")),
+                )
+
+        return None
+
+    def _split_batched_query(
+        self, result, coordinates, positions, radii, indices, keys, output
+    ):
+        # Assign the rows of a batched query to each of the query positions (in ``indices``) and cache them. A row
+        # lying in several of the cones is given to each of them. The cones are padded by 1 mas for rounding.
+        _ras, _decs = positions.ra.rad, positions.dec.rad
+        _radii = radii.to_value(units.rad) + (1 * units.mas).to_value(units.rad)
+
+        for i in indices:
+            if len(result):
+                _separations = angular_separation(*coordinates, _ras[i], _decs[i])
+                query = SourceTable(result[_separations <= _radii[i]])
+            else:
+                query = SourceTable(result.copy())
+
+            query.schema = self.query_schema
+            self._set_cached_query(keys[i], query)
+            output[i] = query
+
     def query_object(self, object_name: str):
         """
         Query SIMBAD for data related to a particular object.
@@ -7,8 +7,10 @@ Notes
 The :py:mod:`structures.map` module provides an interface for managing data on the sky. The :py:class:`structures.map.MapAtlas` class
 represents a collection of :py:class:`structures.map.Map` objects. Each of these maps acts like a function of sky position.
 """
+import os
 import pathlib as pt
 import warnings
+from functools import lru_cache
 from time import asctime
 from types import SimpleNamespace
 
@@ -21,8 +23,12 @@ from astropy.io import fits
 from tqdm.auto import tqdm
 from tqdm.contrib.logging import logging_redirect_tqdm
 
-from pyXMIP.utilities.core import enforce_units
-from pyXMIP.utilities.geo import convert_coordinates, convert_skycoord
+from pyXMIP.structures.table import append_table_to_fits
+from pyXMIP.utilities.core import enforce_units, find_descriptors
+from pyXMIP.utilities.geo import (
+    convert_coordinates,
+    transform_frame_coordinates,
+)
 from pyXMIP.utilities.logging import mainlog
 from pyXMIP.utilities.plot import _enforce_style, plot_healpix
 
@@ -39,14 +45,24 @@ class _AtlasHeaderParam:
             else:
                 raise AttributeError
         except AttributeError:
-            with fits.open(instance.path) as hudl:
-                setattr(instance, f"_{self._name}", hudl[0].header[self._name])
-                return hudl[0].header[self._name]
+            # Atlases fill every header parameter from their cached handle at once, maps only need the primary header.
+            if isinstance(instance, MapAtlas):
+                instance._load_header_cache()
+                val = getattr(instance, f"_{self._name}", None)
+                if val is None:
+                    val = instance._hudl[0].header[self._name]
+            else:
+                val = fits.getval(instance.path, self._name, ext=0)
+
+            setattr(instance, f"_{self._name}", val)
+            return val
 
     def __set__(self, instance, value):
-        with fits.open(instance.path, "update") as hudl:
-            hudl[0].header[self._name] = value
-            hudl.flush()
+        if isinstance(instance, MapAtlas):
+            instance.close()
+
+        fits.setval(instance.path, self._name, value=value, ext=0)
+        setattr(instance, f"_{self._name}", value)
 
 
 class _MapHeaderParam:
@@ -61,16 +77,13 @@ class _MapHeaderParam:
             else:
                 raise AttributeError
         except AttributeError:
-            with fits.open(instance.path) as hudl:
-                setattr(
-                    instance, f"_{self._name}", hudl[instance.name].header[self._name]
-                )
-                return hudl[instance.name].header[self._name]
+            val = fits.getval(instance.path, self._name, extname=instance.name)
+            setattr(instance, f"_{self._name}", val)
+            return val
 
     def __set__(self, instance, value):
-        with fits.open(instance.path, "update") as hudl:
-            hudl[instance.name].header[self._name] = value
-            hudl.flush()
+        fits.setval(instance.path, self._name, value=value, extname=instance.name)
+        setattr(instance, f"_{self._name}", value)
 
 
 class MapAtlas:
@@ -126,6 +139,46 @@ class MapAtlas:
         if not pt.Path(self.path).exists():
             raise FileNotFoundError(f"There is no Atlas file at {self.path}.")
 
+        # -- cached read-only handle on the atlas file (see _hudl) -- #
+        self._hudl_cache, self._hudl_mtime = None, None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def _hudl(self) -> fits.HDUList:
+        # Read-only HDUList shared by all of the read paths, so that the headers are only parsed once instead of on
+        # every access. It is (lazily) reopened whenever the file has been modified since it was opened. Writes close
+        # it first (see close). The file isn't memory mapped, so that the handle never keeps the file locked (Windows)
+        # once it has been closed.
+        _mtime = os.stat(self.path).st_mtime_ns
+        if self._hudl_cache is None or self._hudl_mtime != _mtime:
+            self.close()
+            self._hudl_cache = fits.open(self.path, lazy_load_hdus=True, memmap=False)
+            self._hudl_mtime = _mtime
+
+        return self._hudl_cache
+
+    def close(self):
+        """
+        Close the cached (read-only) handle on the atlas file.
+
+        It is reopened as needed; this only has to be called to release the file. Every write to the atlas goes
+        through this method first, so the next read always reopens the file, even if the write landed in the same
+        mtime tick as the previous open.
+        """
+        if getattr(self, "_hudl_cache", None) is not None:
+            self._hudl_cache.close()
+            self._hudl_cache = None
+
+        self._hudl_mtime = None
+
     def get_map(self, name):
         """
         Obtain an instance of the map corresponding the the name specified from this Atlas.
@@ -162,12 +215,11 @@ class MapAtlas:
         -------
         list
         """
-        with fits.open(self.path, "update") as hudl:
-            return [
-                q.name
-                for q in hudl
-                if isinstance(q, fits.ImageHDU) and q.header["ISMAP"]
-            ]
+        return [
+            q.name
+            for q in self._hudl
+            if isinstance(q, fits.ImageHDU) and q.header["ISMAP"]
+        ]
 
     @property
     def has_maps(self):
@@ -182,25 +234,30 @@ class MapAtlas:
         -------
         list
         """
-        with fits.open(self.path, "update") as hudl:
-            return [u.name for u in hudl]
+        return [u.name for u in self._hudl]
 
     @property
     def coordinate_frame(self):
         """The :py:class:`astropy.coordinates.GenericFrame` for the Atlas's coordinate system"""
-        return getattr(astro_coords, self.CSYS)
+        return _frame_class(self.CSYS)
 
     @property
     def pixel_positions(self):
         """The SkyCoord positions of the healpix pixels."""
-        _th, _ph = hp.pix2ang(self.NSIDE, np.arange(self.NPIX))
-        _ph, _th = convert_coordinates(
-            _ph, _th, from_system="healpix", to_system="latlon"
-        )
-        return astro_coords.SkyCoord(_ph, _th, frame=self.coordinate_frame, unit="rad")
+        # The grid only depends on the HEALPix geometry and the frame, so it's built once for each.
+        _key = (self.NSIDE, self.CSYS)
+        _cache = getattr(self, "_pixel_positions", None)
+        if _cache is None or _cache[0] != _key:
+            _cache = (
+                _key,
+                _healpix_skycoord(self.NSIDE, self.NPIX, self.coordinate_frame),
+            )
+            self._pixel_positions = _cache
+
+        return _cache[1]
 
     @classmethod
-    def generate(cls, path, resolution, overwrite=False):
+    def generate(cls, path, resolution, overwrite=False, power_of_two=False):
         """
         Create an empty :py:class:`SkyAtlas` of a given resolution.
 
@@ -212,6 +269,9 @@ class MapAtlas:
             The resolution of the HEALPix grid. If a value is passed with units, the units are assumed to be in ``rad``.
         overwrite: bool
             Allow file overwrite.
+        power_of_two: bool, optional
+            If ``True``, round ``NSIDE`` up to the next power of 2 (required for ``NESTED`` ordering). By default,
+            ``NSIDE`` is the smallest integer meeting the resolution, as it always has been.
 
         Returns
         -------
@@ -219,15 +279,15 @@ class MapAtlas:
         """
         from astropy.io import fits
 
-        resolution = enforce_units(resolution, units.rad)
+        resolution = _as_radians(resolution)
 
         mainlog.info(
-            f"Generating blank SkyAtlas with resolution {resolution} at {path}."
+            f"Generating blank SkyAtlas with resolution {resolution} rad at {path}."
         )
 
         # -- resolving the grid -- #
-        n_sides = int(np.ceil(1 / (resolution.to_value(units.rad) * np.sqrt(3))))
-        n_pixels = hp.nside2npix(n_sides)
+        n_sides = _resolution_to_nside(resolution, power_of_two=power_of_two)
+        n_pixels = 12 * n_sides * n_sides
 
         # -- generating the meta data -- #
         header = fits.Header()
@@ -236,7 +296,7 @@ class MapAtlas:
         header["EDATE"] = asctime()
         header["NSIDE"] = n_sides
         header["NPIX"] = n_pixels
-        header["RES"] = resolution.to_value(units.rad)
+        header["RES"] = resolution
         header["CSYS"] = "ICRS"
 
         # -- creating the fits file -- #
@@ -246,7 +306,7 @@ class MapAtlas:
 
         return cls(path)
 
-    def reshape_healpix(self, resolution, force=False):
+    def reshape_healpix(self, resolution, force=False, power_of_two=False):
         """
         Reshape the underlying HEALPix grid for the data.
 
@@ -256,67 +316,89 @@ class MapAtlas:
 
         Parameters
         ----------
-        resolution: units.Quantity
-            The resolution radius of the new HEALPix grid.
+        resolution: :py:class:`astropy.units.Quantity` or Number
+            The resolution radius of the new HEALPix grid. If a value is passed without units, it is assumed to be in
+            ``rad``.
         force: bool, optional
             If ``True``, force the deletion of maps instead of failing when they are encountered.
+        power_of_two: bool, optional
+            If ``True``, round ``NSIDE`` up to the next power of 2. See :py:meth:`MapAtlas.generate`.
 
         Returns
         -------
         None
         """
+        resolution = _as_radians(resolution)
+
         mainlog.info(
-            f"Reshaping HEALPix grid to resolution {resolution} [{self.path}]."
+            f"Reshaping HEALPix grid to resolution {resolution} rad [{self.path}]."
         )
 
-        # ----------------------------------------------------------#
-        # Managing existing HEALPix grids that need to be replaced
-        # ----------------------------------------------------------#
-        if not force and self.has_maps:
-            raise ValueError(
-                "Maps already exist in this atlas. They will be removed if you proceed. To proceed use force=True."
-            )
-        elif self.has_maps:
-            mainlog.warning(
-                f"Deleted {len(self.map_names)} maps from {self.path} to change HEALPix size."
-            )
-            with fits.open(self.path, "update") as hudl:
-                for name in self.map_names:
+        # The map scan, the map deletion and the header update are all done on a single update-mode handle.
+        self.close()
+        with fits.open(self.path, "update", lazy_load_hdus=True) as hudl:
+            # ----------------------------------------------------------#
+            # Managing existing HEALPix grids that need to be replaced
+            # ----------------------------------------------------------#
+            _map_names = [
+                q.name
+                for q in hudl
+                if isinstance(q, fits.ImageHDU) and q.header["ISMAP"]
+            ]
+
+            if not force and len(_map_names):
+                raise ValueError(
+                    "Maps already exist in this atlas. They will be removed if you proceed. To proceed use force=True."
+                )
+            elif len(_map_names):
+                mainlog.warning(
+                    f"Deleted {len(_map_names)} maps from {self.path} to change HEALPix size."
+                )
+                for name in _map_names:
                     del hudl[name]
 
-                hudl.flush()
-        else:
-            pass
-        # ----------------------------------------------------------#
-        # Changing the HEALPix geometry.
-        # ----------------------------------------------------------#
-        n_sides = int(np.ceil(1 / (resolution.to_value(units.rad) * np.sqrt(3))))
-        n_pixels = hp.nside2npix(n_sides)
+            # ----------------------------------------------------------#
+            # Changing the HEALPix geometry.
+            # ----------------------------------------------------------#
+            n_sides = _resolution_to_nside(resolution, power_of_two=power_of_two)
+            n_pixels = 12 * n_sides * n_sides
 
-        with fits.open(self.path, "update") as hudl:
             hudl[0].header["NSIDE"] = n_sides
             hudl[0].header["NPIX"] = n_pixels
-            hudl[0].header["RES"] = resolution.to_value(units.rad)
+            hudl[0].header["RES"] = resolution
             hudl[0].header["EDATE"] = asctime()
 
             hudl.flush()
 
+        self._update_attributes()
+
     def remove(self):
         mainlog.info(f"Removing {self.path}.")
+        self.close()
         pt.Path(self.path).unlink()
         del self
 
     @classmethod
+    @lru_cache(maxsize=None)
     def _get_descriptors(cls):
-        # fetching descriptors.
-        return [m for m, v in cls.__dict__.items() if isinstance(v, _AtlasHeaderParam)]
+        # fetching descriptors. The result only depends on the class, so it is cached.
+        return tuple(find_descriptors(cls, (_AtlasHeaderParam,)))
 
     def _update_attributes(self):
         # fetch the attached descriptors
         descriptors = self._get_descriptors()
 
         for descriptor in descriptors:
-            setattr(self, f"_{descriptor._name}", None)  # resets everything.
+            setattr(self, f"_{descriptor}", None)  # resets everything.
+
+    def _load_header_cache(self):
+        # Populate all of the header parameters in a single pass over the primary header, so the first access to any
+        # of them caches the rest as well.
+        _header = self._hudl[0].header
+
+        for descriptor in self._get_descriptors():
+            if descriptor in _header:
+                setattr(self, f"_{descriptor}", _header[descriptor])
 
 
 class StatAtlas(MapAtlas):
@@ -344,6 +426,9 @@ class StatAtlas(MapAtlas):
     def __init__(self, filepath):
         super().__init__(filepath)
 
+        # -- cached output of get_points; every writer drops it -- #
+        self._points = None
+
     def __len__(self):
         return len(self.COUNTS)
 
@@ -351,14 +436,17 @@ class StatAtlas(MapAtlas):
     def COUNTS(self):
         from astropy.table import Table
 
-        with warnings.catch_warnings(), fits.open(self.path) as hudl:
+        with warnings.catch_warnings():
             warnings.simplefilter("ignore")
-            return Table(hudl["COUNTS"].data)
+            return Table(self._hudl["COUNTS"].data)
 
     def get_points(self):
         """
         Fetch the underlying ``COUNTS`` table for the atlas.
 
+        The table (and its ``PIX_ID`` column) is cached until the atlas is written to (or the file or its HEALPix
+        geometry changes), so repeated calls don't re-read and re-bin the counts.
+
         Returns
         -------
         :py:class:`astropy.table.Table`
@@ -367,26 +455,38 @@ class StatAtlas(MapAtlas):
 
         from astropy.table import Table
 
+        # accessing the handle refreshes it (and its mtime) if the file was modified.
+        _hudl = self._hudl
+        _key = (self._hudl_mtime, self.NSIDE, self.CSYS)
+        _cache = self._points
+        if _cache is not None and _cache[0] == _key:
+            # new table object over the same columns; adding / removing columns doesn't touch the cache.
+            return _cache[1].copy(copy_data=False)
+
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
-            with fits.open(self.path) as hudl:
-                _out = Table(hudl["COUNTS"].data)
+            _out = Table(_hudl["COUNTS"].data)
 
         # determining the HEALPix grid
         # !We ALWAYS write counts in RA/DEC for simplicity.
-        count_positions = astro_coords.SkyCoord(
-            ra=_out["RA"], dec=_out["DEC"], unit="deg"
+        # The angles are copied out of the table once; every unit conversion / wrap after that is done in place.
+        _lon, _lat = (
+            np.array(_out["RA"], dtype="f8"),
+            np.array(_out["DEC"], dtype="f8"),
         )
+        np.deg2rad(_lon, out=_lon)
+        np.deg2rad(_lat, out=_lat)
 
-        _p, _t = (
-            count_positions.transform_to(self.coordinate_frame).spherical.lon.rad,
-            count_positions.transform_to(self.coordinate_frame).spherical.lat.rad,
-        )
-        _p, _t = convert_coordinates(_p, _t, from_system="latlon", to_system="healpix")
+        _lon, _lat = transform_frame_coordinates(_lon, _lat, "icrs", self.CSYS)
+
+        np.rad2deg(_lon, out=_lon)
+        np.rad2deg(_lat, out=_lat)
+        np.mod(_lon, 360, out=_lon)
 
-        _out["PIX_ID"] = hp.ang2pix(self.NSIDE, _t, _p)
+        _out["PIX_ID"] = hp.ang2pix(self.NSIDE, _lon, _lat, lonlat=True)
 
-        return _out
+        self._points = (_key, _out)
+        return _out.copy(copy_data=False)
 
     def sample_from_database(self, npoints, search_radius, *args, **kwargs):
         """
@@ -402,7 +502,8 @@ class StatAtlas(MapAtlas):
         args
             Additional arguments to pass through.
         kwargs
-            Additional key-word arguments to pass through.
+            Additional key-word arguments to pass through to :py:meth:`SourceDatabase.random_sample_count` (e.g.
+            ``rng`` to make the sample reproducible).
 
         Returns
         -------
@@ -448,6 +549,8 @@ class StatAtlas(MapAtlas):
         # =========================================== #
         # Writing the map to an HDU of the correct name
         object_type = object_type.upper()
+        self.close()
+        self._points = None
         with fits.open(self.path, "update") as hdul:
             if object_type in [hdu.name for hdu in hdul] and not overwrite:
                 # The map already exists and we cannot overwrite.
@@ -470,31 +573,24 @@ class StatAtlas(MapAtlas):
             hdul.flush()
 
     @classmethod
-    def generate(cls, path, resolution, overwrite=False, database="NONE"):
-        obj = super().generate(path, resolution, overwrite=overwrite)
+    def generate(
+        cls, path, resolution, overwrite=False, database="NONE", power_of_two=False
+    ):
+        obj = super().generate(
+            path, resolution, overwrite=overwrite, power_of_two=power_of_two
+        )
         obj.DBNAME = database
 
         return obj
 
-    def append_to_fits(self, table, hudl):
-        _self_hudl = fits.table_to_hdu(table)
+    def reshape_healpix(self, resolution, force=False, power_of_two=False):
+        self._points = None
+        super().reshape_healpix(resolution, force=force, power_of_two=power_of_two)
 
-        with fits.open(self.path, "update") as hudl_list:
-            if hudl in hudl_list:
-                _hudl, _len_hudl = hudl_list[hudl], len(hudl_list[hudl].data)
-                new_hudl = fits.BinTableHDU.from_columns(
-                    _hudl.columns, nrows=_len_hudl + len(table)
-                )
-                for colname in hudl_list[hudl].columns.names:
-                    new_hudl.data[colname][_len_hudl:] = _self_hudl.data[colname]
-
-                del hudl_list[hudl]
-            else:
-                new_hudl = fits.table_to_hdu(table)
-
-            new_hudl.name = hudl
-            hudl_list.append(new_hudl)
-            hudl_list.flush()
+    def append_to_fits(self, table, hudl):
+        self.close()
+        self._points = None
+        append_table_to_fits(table, self.path, hudl)
 
 
 class PoissonAtlas(StatAtlas):
@@ -643,6 +739,8 @@ class PoissonAtlas(StatAtlas):
                 bkwargs["progress_bar"] = kwargs.get(
                     "progress_bar", bkwargs.get("progress_bar", True)
                 )
+                # share the already loaded count data instead of re-reading it for each map.
+                bkwargs.setdefault("count_table", _count_data)
 
                 self.build_poisson_map(
                     object_type,
@@ -673,6 +771,13 @@ class PoissonAtlas(StatAtlas):
         cross_validate
         training_kw
         param_kw
+        count_table: :py:class:`astropy.table.Table`, optional
+            The (already loaded) output of :py:meth:`StatAtlas.get_points`. If not provided, it is read from disk.
+        predict_chunksize: int, optional
+            The number of pixels to evaluate the trained regressor on at once. Default is ``65536``.
+        predict_threading_kw: dict, optional
+            Threading parameters (see :py:func:`utilities.optimize.map_to_threads`) for evaluating the blocks in parallel.
+            By default, the blocks are evaluated serially.
 
         Returns
         -------
@@ -681,15 +786,15 @@ class PoissonAtlas(StatAtlas):
         # =================================================== #
         # SETUP
         # =================================================== #
-        phi, theta = convert_skycoord(
-            self.pixel_positions.transform_to("icrs"), "math_convention"
-        )
-        map_positions = np.vstack(
-            [theta, phi]
-        ).T  # --> This is done in oposite order for haversine.
+        map_positions = self._get_regressor_grid()
 
         # get the points that are being fitted.
-        count_data = self.get_points()
+        count_data = kwargs.pop("count_table", None)
+        if count_data is None:
+            count_data = self.get_points()
+
+        # the positions and areas are shared between the cross-validation and the training.
+        positions_and_areas = regressor.get_positions_and_areas(count_data)
 
         if cv_kw is None:
             cv_kw = {}
@@ -702,6 +807,7 @@ class PoissonAtlas(StatAtlas):
                 object_type,
                 training_kw=training_kw,
                 param_kw=param_kw,
+                positions_and_areas=positions_and_areas,
                 **cv_kw,
             )
 
@@ -734,7 +840,12 @@ class PoissonAtlas(StatAtlas):
         # ================================================= #
         if retrain:
             training_kw = {} if training_kw is None else training_kw
-            score = regressor.train_model(count_data, object_type, **training_kw)
+            score = regressor.train_model(
+                count_data,
+                object_type,
+                positions_and_areas=positions_and_areas,
+                **training_kw,
+            )
 
             if kwargs.get("score_threshold", None) is not None:
                 # the user has specified a cross validation score threshold.
@@ -746,10 +857,41 @@ class PoissonAtlas(StatAtlas):
         # ================================================= #
         # Output
         # ================================================= #
-        _out_map = regressor.regressor.predict(map_positions)
+        _out_map = _predict_in_blocks(
+            regressor.regressor,
+            map_positions,
+            chunksize=kwargs.pop("predict_chunksize", 65536),
+            threading_kw=kwargs.pop("predict_threading_kw", None),
+        )
 
         return SimpleNamespace(map=_out_map, method=regressor.__class__.__name__)
 
+    def _get_regressor_grid(self):
+        # The (haversine convention) evaluation grid for the regressors. It only depends on the HEALPix geometry and
+        # the frame, so it's cached and shared between every map built from this atlas.
+        _key = (self.NSIDE, self.CSYS)
+        _cache = getattr(self, "_regressor_grid", None)
+        if _cache is not None and _cache[0] == _key:
+            return _cache[1]
+
+        # pixel positions in ICRS; done as a single rotation instead of building SkyCoords over the full grid.
+        _lon, _lat = hp.pix2ang(self.NSIDE, np.arange(self.NPIX), lonlat=True)
+        _lon, _lat = transform_frame_coordinates(
+            np.deg2rad(_lon), np.deg2rad(_lat), self.coordinate_frame.name, "icrs"
+        )
+        phi, theta = convert_coordinates(
+            np.mod(_lon + np.pi, 2 * np.pi) - np.pi,  # wrap at 180 deg.
+            _lat,
+            from_system="latlon",
+            to_system="math_convention",
+        )
+        map_positions = np.column_stack(
+            (theta, phi)
+        )  # --> This is done in oposite order for haversine.
+
+        self._regressor_grid = (_key, map_positions)
+        return map_positions
+
     def build_poisson_map_KNN(self, object_type, *args, **kwargs):
         from pyXMIP.stats.map_regression import KNNeighborMapRegressor
 
@@ -773,7 +915,9 @@ class PoissonAtlas(StatAtlas):
 
         _ = args
         # -- pull counts data -- #
-        count_table = self.get_points()
+        count_table = kwargs.pop("count_table", None)
+        if count_table is None:
+            count_table = self.get_points()
 
         # -- setup the regressor -- #
         regressor = BayesianPoissonMapRegressor(
@@ -818,12 +962,21 @@ class Map:
         self.name = name.upper()
 
         # -- reading the values -- #
-        with fits.open(self.path) as hudl:
+        # The map is copied out of the file (no memmap is left pinned to the closed file) and the header parameters
+        # are all resolved in the same pass, so evaluating the map never has to go back to the file.
+        with fits.open(self.path, memmap=False) as hudl:
             assert name in [
                 u.name for u in hudl
             ], f"There is no SkyMap {name} in {path}."
 
-            self._data = hudl[name].data
+            self._data = np.ascontiguousarray(hudl[name].data)
+
+            _descriptors = find_descriptors(
+                type(self), (_AtlasHeaderParam, _MapHeaderParam)
+            )
+            for descriptor, parameter in _descriptors.items():
+                _hdu = 0 if isinstance(parameter, _AtlasHeaderParam) else name
+                setattr(self, f"_{descriptor}", hudl[_hdu].header.get(descriptor))
 
     def __call__(self, position):
         """
@@ -839,13 +992,10 @@ class Map:
         return self.data[pixels]
 
     @classmethod
+    @lru_cache(maxsize=None)
     def _get_descriptors(cls):
-        # fetching descriptors.
-        return [
-            m
-            for m, v in cls.__dict__.items()
-            if isinstance(v, (_AtlasHeaderParam, _MapHeaderParam))
-        ]
+        # fetching descriptors. The result only depends on the class, so it is cached.
+        return tuple(find_descriptors(cls, (_AtlasHeaderParam, _MapHeaderParam)))
 
     def _update_attributes(self):
         # fetch the attached descriptors
@@ -863,8 +1013,8 @@ class Map:
             else:
                 raise AttributeError
         except AttributeError:
-            with fits.open(self.path) as hudl:
-                self._data = hudl[self.name].data
+            with fits.open(self.path, memmap=False) as hudl:
+                self._data = np.ascontiguousarray(hudl[self.name].data)
                 return self._data
 
     @data.setter
@@ -873,27 +1023,23 @@ class Map:
             hudl[self.name].data = value
             hudl.flush()
 
+        self._data = np.ascontiguousarray(value)
         self.ED = asctime()
 
     @property
     def coordinate_frame(self):
         """The :py:class:`astropy.coordinates.GenericFrame` for the Atlas's coordinate system"""
-        with fits.open(self.path) as hudl:
-            return getattr(astro_coords, hudl[self.name].header["CSYS"])
+        return _frame_class(self.CSYS)
 
     def transform_map_coordinates(self, frame, inplace=False):
         # -- coercing the frame type -- #
         if isinstance(frame, str):
-            frame = getattr(astro_coords, frame)
+            frame = _frame_class(frame)
         else:
             pass
 
         # -- converting -- #
-        _th, _ph = hp.pix2ang(self.NSIDE, np.arange(self.NPIX))
-        _ph, _th = convert_coordinates(
-            _ph, _th, from_system="healpix", to_system="latlon"
-        )
-        coords = astro_coords.SkyCoord(_ph, _th, frame=frame, unit="rad")
+        coords = _healpix_skycoord(self.NSIDE, self.NPIX, frame)
         output_array = self(coords)
 
         if inplace:
@@ -910,28 +1056,102 @@ class Map:
     @property
     def pixel_positions(self):
         """The SkyCoord positions of the healpix pixels."""
-        _th, _ph = hp.pix2ang(self.NSIDE, np.arange(self.NPIX))
-        _ph, _th = convert_coordinates(
-            _ph, _th, from_system="healpix", to_system="latlon"
-        )
-        return astro_coords.SkyCoord(_ph, _th, frame=self.coordinate_frame, unit="rad")
+        # The grid only depends on the HEALPix geometry and the frame, so it's built once for each.
+        _key = (self.NSIDE, self.CSYS)
+        _cache = getattr(self, "_pixel_positions", None)
+        if _cache is None or _cache[0] != _key:
+            _cache = (
+                _key,
+                _healpix_skycoord(self.NSIDE, self.NPIX, self.coordinate_frame),
+            )
+            self._pixel_positions = _cache
+
+        return _cache[1]
 
     def get_healpix_id(self, positions, frame=None):
         if frame is None:
             frame = self.coordinate_frame
 
-        positions = positions.transform_to(frame)
-        _ph, _th = convert_skycoord(positions, "healpix")
-        print(_ph, _th)
-        ids = hp.ang2pix(self.NSIDE, _th, _ph)
-
-        return ids
+        # healpy takes lon / lat (degrees) directly; no HEALPix-convention (colatitude) arrays are needed.
+        positions = _transform_skycoord(positions, frame).spherical
+        return hp.ang2pix(self.NSIDE, positions.lon.deg, positions.lat.deg, lonlat=True)
 
     @_enforce_style
     def plot(self, *args, **kwargs):
         return plot_healpix(self.data, *args, **kwargs)
 
 
+def _predict_in_blocks(estimator, positions, chunksize=65536, threading_kw=None):
+    # Evaluate the estimator over the grid in fixed size blocks. The neighbor searches allocate working arrays which scale
+    # with the number of query points; blocking keeps them bounded for high resolution grids. The blocks are independent
+    # and sklearn's neighbor kernels release the GIL, so they may be farmed out to threads.
+    from pyXMIP.utilities.optimize import map_to_threads
+
+    output = np.empty(len(positions), dtype="float64")
+    starts = range(0, len(positions), chunksize)
+
+    blocks = map_to_threads(
+        estimator.predict,
+        [positions[start : start + chunksize] for start in starts],
+        threading_kw=threading_kw,
+    )
+    for start, block in zip(starts, blocks):
+        output[start : start + len(block)] = block
+
+    return output
+
+
+@lru_cache(maxsize=None)
+def _frame_class(name):
+    # The astropy frame class for a CSYS name. Resolved once per name; the properties keyed on CSYS stay correct if
+    # the header value is changed.
+    return getattr(astro_coords, name)
+
+
+def _as_radians(value):
+    # A scalar angle as a float in radians. Values without units are taken to already be in radians, so plain
+    # numbers skip the Quantity construction / conversion altogether.
+    if isinstance(value, units.Quantity):
+        return float(enforce_units(value, units.rad).value)
+    return float(value)
+
+
+def _resolution_to_nside(resolution, power_of_two=False):
+    # Determine the smallest NSIDE whose pixels are no larger than the requested resolution (in radians). This is the
+    # grid atlases have always been built on (e.g. 1 deg -> 34), so it stays the default; rounding up to a power of 2
+    # (needed for NESTED ordering) is opt-in since it changes the grid of existing atlases.
+    target = int(np.ceil(1.0 / (resolution * np.sqrt(3))))
+    if power_of_two:
+        return 1 << int(np.ceil(np.log2(max(target, 1))))
+
+    return target
+
+
+def _healpix_skycoord(nside, npix, frame):
+    # SkyCoord positions of every pixel on the grid. ``lonlat=True`` hands back lon / lat directly so no
+    # colatitude -> latitude pass is needed over the pixel arrays.
+    # The angles are wrapped as Quantities without copying, so the SkyCoord doesn't have to re-interpret the units.
+    _lon, _lat = hp.pix2ang(nside, np.arange(npix), lonlat=True)
+    return astro_coords.SkyCoord(
+        units.Quantity(_lon, units.deg, copy=False),
+        units.Quantity(_lat, units.deg, copy=False),
+        frame=frame,
+    )
+
+
+def _transform_skycoord(positions, frame):
+    # Transform positions to frame, skipping the transformation graph entirely when they are already there.
+    if isinstance(frame, str):
+        frame = astro_coords.frame_transform_graph.lookup_name(frame)
+    if isinstance(frame, type):
+        frame = frame()
+
+    if positions.is_equivalent_frame(frame):
+        return positions
+
+    return positions.transform_to(frame)
+
+
 def _parse_default_kwarg_groups(defaults, kwargs):
     # -- setting args and kwargs -- #
     out = {k: kwargs.pop(k, None) for k in defaults}
@@ -451,7 +451,7 @@ class AstrometricReductionProcess(ReductionProcess):
                     (2 * np.pi)
                     * (
                         (cra * cdec * dra * ddec)
-                        / (np.sqrt((cra**-2 + dra**-2) * (cdec**-2 + ddec**-2)))
+                        / (np.sqrt((iscra + isdra) * (iscdec + isddec)))
                     )
                 )
 
@@ -469,8 +469,10 @@ class AstrometricReductionProcess(ReductionProcess):
         def _pfunc(table_chunk, f=_func, df=displacement_function, p=self.prior):
             table_chunk = f(table_chunk, df=df)
 
+            # evaluate the prior once per chunk; it's used in both terms.
+            _prior = p(table_chunk)
             table_chunk[self.score_col] = (
-                1 + (1 - p(table_chunk)) / (p(table_chunk) * table_chunk["bf"])
+                1 + (1 - _prior) / (_prior * table_chunk["bf"])
             ) ** (-1)
 
             return table_chunk
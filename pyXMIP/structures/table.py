@@ -13,7 +13,6 @@ key exceptions:
 For general usage information, particularly regarding interacting with, slicing from, and altering tables, we recommend
 reading the associated ``astropy`` documentation `here <https://docs.astropy.org/en/stable/table/index.html>`_.
 """
-import re
 from typing import Generic, Type, TypeVar
 
 import numpy as np
@@ -136,8 +135,9 @@ class SourceTable(Table):
         if unit is None:
             unit = self.schema.default_angle_units
 
+        column = self[self.schema.coordinate_columns[0].name]
         return enforce_units(
-            units.Quantity(self[self.schema.coordinate_columns[0].name]),
+            units.Quantity(column) if column.unit is not None else np.asarray(column),
             unit,
         )
 
@@ -164,8 +164,9 @@ class SourceTable(Table):
         if unit is None:
             unit = self.schema.default_angle_units
 
+        column = self[self.schema.coordinate_columns[1].name]
         return enforce_units(
-            units.Quantity(self[self.schema.coordinate_columns[1].name]),
+            units.Quantity(column) if column.unit is not None else np.asarray(column),
             unit,
         )
 
@@ -224,32 +225,7 @@ class SourceTable(Table):
         Table
             The count table. Formatted as the type followed by the number of such types.
         """
-        assert (
-            self.schema.TYPE in self.columns
-        ), f"Cannot count types because there is no TYPE column {self.schema.TYPE}."
-
-        # ------------------------------------------------- #
-        # Correcting the formatting
-        # ------------------------------------------------- #
-        if len(self) == 0:
-            # This is operational redundancy. If the table has no entries, we can just return 0 for each object type.
-            return Table({k: [0] for k in self.schema.object_map})
-
-        # Collect the separator #
-        _sep = self.schema.object_type_separator
-
-        # -- Managing types for non-zero length -- #
-        _types = pd.Series(
-            self.get_formatted_types()
-        )  # --> this does all the reformatting.
-        return Table(
-            {
-                k: [
-                    len(_types[_types.str.contains(f"{re.escape(f'{_sep}{k}{_sep}')}")])
-                ]
-                for k in self.schema.object_map
-            }
-        )
+        return count_table_types([self])
 
     def append_to_fits(self, path, hdu):
         """
@@ -263,25 +239,8 @@ class SourceTable(Table):
             The name of the HDU to append to.
 
         """
-        _self_hdu = fits.table_to_hdu(self)
-
         try:
-            with fits.open(path, "update") as hdu_list:
-                if hdu in hdu_list:
-                    _hdul, _len_hdul = hdu_list[hdu], len(hdu_list[hdu].data)
-                    new_hudl = fits.BinTableHDU.from_columns(
-                        _hdul.columns, nrows=_len_hdul + len(self)
-                    )
-                    for colname in hdu_list[hdu].columns.names:
-                        new_hudl.data[colname][_len_hdul:] = _self_hdu.data[colname]
-
-                    del hdu_list[hdu]
-                else:
-                    new_hudl = fits.table_to_hdu(self)
-
-                new_hudl.name = hdu
-                hdu_list.append(new_hudl)
-                hdu_list.flush()
+            append_table_to_fits(self, path, hdu)
         except Warning:
             raise ValueError()
 
@@ -310,7 +269,7 @@ class SourceTable(Table):
         return table
 
 
-def format_table_types(table: Table, schema: SourceTableSchema = None) -> list:
+def format_table_types(table: Table, schema: SourceTableSchema = None) -> np.ndarray:
     """
     Returns an altered version of the :py:attr:`SourceTable.TYPE` column with standardized formatting.
 
@@ -324,7 +283,7 @@ def format_table_types(table: Table, schema: SourceTableSchema = None) -> list:
 
     Returns
     -------
-    Column
+    numpy.ndarray
         The corrected formatting.
 
     Notes
@@ -345,26 +304,113 @@ def format_table_types(table: Table, schema: SourceTableSchema = None) -> list:
     # grab the separator for the type column
     _sep = schema.object_type_separator
 
-    # iterate through and correct.
-    _types = list(table[schema.TYPE])
-
-    for i, val in enumerate(_types):
-        if not len(val):
-            # This is a non-specified type. We set it to the ? type.
-            _types[i] = f"{_sep}?{_sep}"
-            continue
+    _types = np.asarray(table[schema.TYPE]).astype("U")
 
-        if val[0] != _sep:
-            # Correct the first column to enforce the separator.
-            _types[i] = _sep + _types[i]
+    # Non-specified types are set to the ? type.
+    _types = np.where(_types == "", "?", _types)
 
-        if val[-1] != _sep:
-            # Correct the final column.
-            _types[i] = _types[i] + _sep
+    # Enforce the separator at the start and end of each entry.
+    _types = np.where(
+        np.char.startswith(_types, _sep), _types, np.char.add(_sep, _types)
+    )
+    _types = np.where(np.char.endswith(_types, _sep), _types, np.char.add(_types, _sep))
 
     return _types
 
 
+def append_table_to_fits(table: Table, path: str, hdu: str):
+    """
+    Append a table to a (binary table) HDU of an existing ``.fits`` file.
+
+    Parameters
+    ----------
+    table: Table
+        The table to append.
+    path: str
+        The path to the fits file to append to.
+    hdu: str
+        The name of the HDU to append to. It is created if it doesn't already exist.
+
+    Raises
+    ------
+    ValueError
+        If the table doesn't have the same columns as the HDU, or its units can't be converted to those of the HDU.
+    TypeError
+        If a column holds strings in the table and numbers in the HDU (or vice versa).
+
+    Notes
+    -----
+    The existing rows are read back as a table and stacked with the new ones (see :py:func:`fast_vstack`), so each
+    column is copied in bulk and takes a type wide enough for both sets of rows (strings are never truncated to the
+    width of the existing column). The new rows are converted to the units of the HDU, and its column formats and
+    header keywords are kept.
+    """
+    with fits.open(path, "update") as hdu_list:
+        if hdu in hdu_list:
+            table = fast_vstack([Table.read(hdu_list[hdu]), Table(table, copy=False)])
+            del hdu_list[hdu]
+
+        new_hdu = fits.table_to_hdu(table)
+        new_hdu.name = hdu
+        hdu_list.append(new_hdu)
+        hdu_list.flush()
+
+
+def count_table_types(tables: list[SourceTable]) -> Table:
+    """
+    Count the number of each object type in each of a collection of tables.
+
+    Parameters
+    ----------
+    tables: list of :py:class:`SourceTable`
+        The tables to count. These must share a schema; the schema of the first table is used.
+
+    Returns
+    -------
+    Table
+        The count table. There is one column for each object type in the schema's object map and one row for each table.
+
+    Notes
+    -----
+    This is equivalent to stacking :py:meth:`SourceTable.count_types` for each table, but the types of every table are
+    split into their individual entries in a single pass and counted together.
+    """
+    schema = tables[0].schema
+    _sep, _keys = schema.object_type_separator, list(schema.object_map)
+
+    _type_column = schema.TYPE
+
+    for table in tables:
+        assert (
+            _type_column in table.columns
+        ), f"Cannot count types because there is no TYPE column {_type_column}."
+
+    # ------------------------------------------------- #
+    # Split the (formatted) types into entries
+    # ------------------------------------------------- #
+    # Each row's types look like |A|B|...|. Every entry is tied back to its row and each row only counts once per type.
+    _lengths = [len(table) for table in tables]
+    _types = pd.Series(
+        np.concatenate([format_table_types(table, schema) for table in tables])
+    )
+    _entries = _types.str[1:-1].str.split(_sep, regex=False).explode()
+    _entries = pd.DataFrame(
+        {"row": _entries.index, "key": pd.Index(_keys).get_indexer(_entries)}
+    ).drop_duplicates()
+    _entries = _entries[_entries["key"] >= 0]
+
+    # ------------------------------------------------- #
+    # Count
+    # ------------------------------------------------- #
+    _table_idx = np.repeat(np.arange(len(tables)), _lengths)[_entries["row"].to_numpy()]
+    counts = np.bincount(
+        _table_idx * len(_keys) + _entries["key"].to_numpy(),
+        minlength=len(tables) * len(_keys),
+    ).reshape(len(tables), len(_keys))
+
+    return Table(counts, names=_keys)
+
+
 def load(path, *args, **kwargs):
     """
     Load a catalog into ``pyXMIP``.
@@ -383,10 +429,114 @@ def load(path, *args, **kwargs):
     return SourceTable.read(path, *args, **kwargs)
 
 
+def fast_vstack(tables: list[Table]) -> Table:
+    """
+    Vertically stack tables which share the same columns (i.e. the same schema).
+
+    Parameters
+    ----------
+    tables: list of Table
+        The tables to stack. The output takes its column order, units, descriptions, formats, column and table
+        metadata, and class from the first table.
+
+    Returns
+    -------
+    Table
+        The stacked table.
+
+    Raises
+    ------
+    ValueError
+        If the tables don't have the same columns, or the units of a column can't be converted to those of the first
+        table.
+    TypeError
+        If a column holds strings in some tables and numbers in others.
+
+    Notes
+    -----
+    Unlike :py:func:`astropy.table.vstack`, the underlying arrays are simply concatenated (after converting them to the
+    units of the first table). Each column takes a type wide enough for every table, so strings are never truncated.
+    Tables with mixin columns (e.g. :py:class:`astropy.units.Quantity`) are handed to :py:func:`astropy.table.vstack`.
+    """
+    from astropy.table import MaskedColumn, vstack
+
+    if not len(tables):
+        return vstack(tables)
+
+    _first = tables[0]
+    for table in tables[1:]:
+        if set(table.colnames) != set(_first.colnames):
+            raise ValueError(
+                f"Cannot stack tables with different columns: {sorted(_first.colnames)} and {sorted(table.colnames)}."
+            )
+
+    if any(
+        not isinstance(table[c], Column) for table in tables for c in _first.colnames
+    ):
+        return vstack(tables, join_type="exact")
+
+    _columns = {}
+    for c in _first.colnames:
+        _column = _first[c]
+        _data = [_stack_column_data(table[c], _column.unit, c) for table in tables]
+        # empty tables don't contribute rows, so their (often default) types aren't held against the others.
+        _data = [d for d in _data if len(d)] or _data[:1]
+        _check_stack_dtypes([d.dtype for d in _data], c)
+
+        if any(isinstance(table[c], MaskedColumn) for table in tables):
+            _column_class, _data = MaskedColumn, np.ma.concatenate(_data)
+        else:
+            _column_class, _data = Column, np.concatenate(_data)
+
+        _columns[c] = _column_class(
+            _data,
+            name=c,
+            unit=_column.unit,
+            description=_column.description,
+            format=_column.format,
+            meta=_column.meta,
+            copy=False,
+        )
+
+    return _first.__class__(_columns, meta=_first.meta, copy=False)
+
+
+def _stack_column_data(column, unit, name):
+    # The data of a column, converted to the unit it is being stacked into.
+    _data = column.data
+    if column.unit == unit:
+        return _data
+
+    if column.unit is None or unit is None:
+        raise ValueError(
+            f"Cannot stack column {name} with units {column.unit} into a column with units {unit}."
+        )
+
+    try:
+        return _data * column.unit.to(unit)
+    except units.UnitConversionError as error:
+        raise ValueError(
+            f"Cannot stack column {name} with units {column.unit} into a column with units {unit}."
+        ) from error
+
+
+def _check_stack_dtypes(dtypes, name):
+    # Strings (and bytes) only stack with strings; numbers are promoted as numpy would.
+    _is_string = {dtype.kind in "SU" for dtype in dtypes}
+    if len(_is_string) > 1:
+        raise TypeError(
+            f"Cannot stack column {name}: it holds strings in some tables and numbers in others {list(dtypes)}."
+        )
+
+
 def correct_column_types(table):
     # -- Fix object column types -- #
     for col in table.columns:
         if table[col].dtype == "object":
-            table[col] = np.array([str(j) for j in table[col]], dtype="<U64")
+            # masked entries are rendered as "--", as str(np.ma.masked) would.
+            _col = table[col]
+            if hasattr(_col, "mask"):
+                _col = _col.filled("--")
+            table[col] = np.asarray(_col).astype("<U64")
 
     return table
@@ -4,9 +4,21 @@ Testing module for pyXMIP's catalogs.
 import os
 import pathlib as pt
 
+import numpy as np
 import pytest
+from astropy import units
+from astropy.io import fits
+from astropy.table import Column, MaskedColumn, Table
 
 from pyXMIP import load
+from pyXMIP.schema import DEFAULT_SOURCE_SCHEMA_REGISTRY
+from pyXMIP.structures.table import (
+    SourceTable,
+    append_table_to_fits,
+    count_table_types,
+    fast_vstack,
+    format_table_types,
+)
 from pyXMIP.utilities.core import bin_directory
 
 test_catalog_path = pt.Path(os.path.join(bin_directory, "testobj", "test_catalog.fits"))
@@ -84,3 +96,250 @@ class TestCatalog:
 
         assert_allclose(_elat, lat, rtol=1e-3)
         assert_allclose(_elon, lon, rtol=1e-3)
+
+
+def _stack_table(n, seed=0, unit=units.deg):
+    rng = np.random.default_rng(seed)
+    return Table(
+        [
+            Column(
+                rng.uniform(0, 10, n),
+                name="RA",
+                unit=unit,
+                description="Right ascension",
+                format=".3f",
+            ),
+            Column(rng.integers(0, 10, n), name="N"),
+            Column([f"obj{i}" for i in range(n)], name="NAME"),
+        ],
+        meta={"ORIGIN": "test"},
+    )
+
+
+class TestFastVstack:
+    """
+    Test :py:func:`pyXMIP.structures.table.fast_vstack`.
+    """
+
+    def test_stack(self):
+        """
+        Test that the rows are stacked in order and the column / table attributes are kept.
+        """
+        _a, _b = _stack_table(5), _stack_table(3, 1)
+        _stacked = fast_vstack([_a, _b])
+
+        assert len(_stacked) == 8
+        for c in _a.colnames:
+            assert np.array_equal(_stacked[c], np.concatenate([_a[c], _b[c]]))
+
+        assert _stacked["RA"].unit == units.deg
+        assert _stacked["RA"].description == "Right ascension"
+        assert _stacked["RA"].format == ".3f"
+        assert _stacked.meta["ORIGIN"] == "test"
+
+    def test_matches_vstack(self):
+        """
+        Test that the output matches astropy's vstack.
+        """
+        from astropy.table import vstack
+
+        _tables = [_stack_table(n, n) for n in (4, 1, 7)]
+        _stacked, _expected = fast_vstack(_tables), vstack(_tables)
+
+        assert _stacked.colnames == _expected.colnames
+        for c in _expected.colnames:
+            assert np.array_equal(_stacked[c], _expected[c])
+            assert _stacked[c].dtype == _expected[c].dtype
+
+    def test_empty(self):
+        """
+        Test that empty tables don't hold their (default) column types against the others.
+        """
+        _a = _stack_table(5)
+        _stacked = fast_vstack([_stack_table(0), _a, _stack_table(0)])
+
+        assert len(_stacked) == 5
+        assert _stacked["NAME"].dtype == _a["NAME"].dtype
+
+    def test_column_order(self):
+        """
+        Test that tables with their columns in another order are stacked by name.
+        """
+        _a, _b = _stack_table(5), _stack_table(3, 1)
+        _stacked = fast_vstack([_a, _b[["NAME", "N", "RA"]]])
+
+        assert _stacked.colnames == _a.colnames
+        assert np.array_equal(_stacked["NAME"][5:], _b["NAME"])
+
+    def test_different_columns(self):
+        """
+        Test that tables with different columns are refused instead of outer-joined.
+        """
+        _a, _b = _stack_table(5), _stack_table(3, 1)
+        _b.remove_column("N")
+
+        with pytest.raises(ValueError):
+            fast_vstack([_a, _b])
+
+        _b["N"], _b["EXTRA"] = 1, 1
+        with pytest.raises(ValueError):
+            fast_vstack([_a, _b])
+
+    def test_units(self):
+        """
+        Test that convertible units are converted to those of the first table, and others are refused.
+        """
+        _a, _b = _stack_table(5), _stack_table(3, 1, unit=units.arcmin)
+        _stacked = fast_vstack([_a, _b])
+
+        assert _stacked["RA"].unit == units.deg
+        assert np.allclose(_stacked["RA"][5:], _b["RA"] / 60)
+
+        for unit in (units.s, None):
+            with pytest.raises(ValueError):
+                fast_vstack([_a, _stack_table(3, 1, unit=unit)])
+
+    def test_dtypes(self):
+        """
+        Test that numbers are promoted, strings widened, and strings never mixed with numbers.
+        """
+        _a, _b = _stack_table(5), _stack_table(3, 1)
+        _b["N"] = _b["N"] + 0.5
+        _b["NAME"] = [f"a_much_longer_name_{i}" for i in range(3)]
+        _stacked = fast_vstack([_a, _b])
+
+        assert _stacked["N"].dtype.kind == "f"
+        assert np.array_equal(_stacked["N"][5:], _b["N"])
+        assert np.array_equal(_stacked["NAME"][5:], _b["NAME"])
+
+        _b["N"] = ["x", "y", "z"]
+        with pytest.raises(TypeError):
+            fast_vstack([_a, _b])
+
+    def test_masked(self):
+        """
+        Test that masks are kept.
+        """
+        _a, _b = _stack_table(2), _stack_table(2, 1)
+        _b["N"] = MaskedColumn(_b["N"], mask=[True, False])
+        _stacked = fast_vstack([_a, _b])
+
+        assert list(_stacked["N"].mask) == [False, False, True, False]
+
+
+class TestAppendTableToFits:
+    """
+    Test :py:func:`pyXMIP.structures.table.append_table_to_fits`.
+    """
+
+    @pytest.fixture
+    def fits_path(self, tmp_path):
+        _path = tmp_path / "table.fits"
+        fits.HDUList([fits.PrimaryHDU()]).writeto(_path)
+        yield _path
+
+    def test_create_and_append(self, fits_path):
+        """
+        Test that the HDU is created and then appended to.
+        """
+        _a, _b = _stack_table(5), _stack_table(3, 1)
+        append_table_to_fits(_a, fits_path, "DATA")
+        append_table_to_fits(_b, fits_path, "DATA")
+
+        _table = Table.read(fits_path, hdu="DATA")
+        assert len(_table) == 8
+        assert np.allclose(_table["RA"], np.concatenate([_a["RA"], _b["RA"]]))
+        assert list(_table["NAME"]) == list(_a["NAME"]) + list(_b["NAME"])
+        assert _table["RA"].unit == units.deg
+        assert _table["RA"].format == Table.read(fits.table_to_hdu(_a))["RA"].format
+        assert _table.meta["ORIGIN"] == "test"
+
+    def test_units(self, fits_path):
+        """
+        Test that appended rows are converted to the units of the HDU, and incompatible ones refused.
+        """
+        append_table_to_fits(_stack_table(5), fits_path, "DATA")
+        _b = _stack_table(3, 1, unit=units.arcmin)
+        append_table_to_fits(_b, fits_path, "DATA")
+
+        _table = Table.read(fits_path, hdu="DATA")
+        assert _table["RA"].unit == units.deg
+        assert np.allclose(_table["RA"][5:], _b["RA"] / 60)
+
+        with pytest.raises(ValueError):
+            append_table_to_fits(_stack_table(3, 1, unit=units.s), fits_path, "DATA")
+        assert len(Table.read(fits_path, hdu="DATA")) == 8
+
+    def test_dtypes(self, fits_path):
+        """
+        Test that longer strings aren't truncated and strings can't be appended to numbers.
+        """
+        append_table_to_fits(_stack_table(5), fits_path, "DATA")
+        _b = _stack_table(3, 1)
+        _b["NAME"] = [f"a_much_longer_name_{i}" for i in range(3)]
+        append_table_to_fits(_b, fits_path, "DATA")
+
+        assert list(Table.read(fits_path, hdu="DATA")["NAME"][5:]) == list(_b["NAME"])
+
+        _b["N"] = ["x", "y", "z"]
+        with pytest.raises(TypeError):
+            append_table_to_fits(_b, fits_path, "DATA")
+
+    def test_different_columns(self, fits_path):
+        """
+        Test that tables with other columns can't be appended.
+        """
+        append_table_to_fits(_stack_table(5), fits_path, "DATA")
+        _b = _stack_table(3, 1)
+        _b["EXTRA"] = 1
+
+        with pytest.raises(ValueError):
+            append_table_to_fits(_b, fits_path, "DATA")
+
+
+class TestCountTableTypes:
+    """
+    Test :py:func:`pyXMIP.structures.table.count_table_types`.
+    """
+
+    @staticmethod
+    def _table(types):
+        table = SourceTable({"OTYPES": np.array(types, dtype="U32")})
+        table.schema = DEFAULT_SOURCE_SCHEMA_REGISTRY["SIMBAD"]
+        return table
+
+    @staticmethod
+    def _expected_counts(table):
+        # the number of rows whose (formatted) types contain |k| for each type k.
+        _sep, _types = table.schema.object_type_separator, format_table_types(table)
+        return {
+            k: int(np.sum(np.char.find(_types, f"{_sep}{k}{_sep}") >= 0))
+            for k in table.schema.object_map
+        }
+
+    def test_counts(self):
+        """
+        Test that each table's counts match a direct substring count.
+        """
+        _tables = [
+            self._table(["*|Ma*", "G", "G|G|*", "", "?", "|G|", "NotAType"]),
+            self._table([]),
+            self._table(["Ma*|Ma?", "*"]),
+        ]
+        _counts = count_table_types(_tables)
+
+        assert len(_counts) == len(_tables)
+        assert _counts.colnames == list(_tables[0].schema.object_map)
+        for row, table in zip(_counts, _tables):
+            assert {k: int(row[k]) for k in _counts.colnames} == self._expected_counts(
+                table
+            )
+
+    def test_count_types(self):
+        """
+        Test that :py:meth:`SourceTable.count_types` counts a single table, and each type at most once per row.
+        """
+        _counts = self._table(["G|G|*", "G"]).count_types()
+
+        assert len(_counts) == 1
+        assert (_counts["G"][0], _counts["*"][0], _counts["Ma*"][0]) == (2, 1, 0)
@@ -2,12 +2,27 @@
 Testing suite for the :py:mod:`pyXMIP.databases` module.
 """
 import os
+from types import SimpleNamespace
 
+import numpy as np
 import pytest
+import sqlalchemy as sql
 from astropy import units
 from astropy.coordinates import SkyCoord
+from astropy.table import Table
+from astroquery.ipac.ned import Ned
+from astroquery.simbad import Simbad
 
-from pyXMIP.structures.databases import DEFAULT_DATABASE_REGISTRY, RemoteDatabase
+from pyXMIP.structures.databases import (
+    DEFAULT_DATABASE_REGISTRY,
+    NED,
+    SIMBAD,
+    DatabaseError,
+    LocalDatabase,
+    RemoteDatabase,
+    _cluster_query_regions,
+)
+from pyXMIP.structures.table import SourceTable
 from pyXMIP.tests.utils import check_astropy_table
 
 database_answer_subdir = "database_answers"
@@ -38,3 +53,546 @@ class RemoteDatabaseTest:
     """
 
     remote_database_name = None  # The name of the remote database.
+
+
+# ======================================================================== #
+# Mocked SIMBAD                                                            #
+# ======================================================================== #
+# These tests never reach the remote service: query_region is answered from a small random catalog.
+mock_catalog = SkyCoord(
+    np.random.default_rng(0).uniform(10, 11, 400),
+    np.random.default_rng(1).uniform(-0.5, 0.5, 400),
+    unit="deg",
+)
+mock_positions = SkyCoord(
+    np.random.default_rng(2).uniform(10.1, 10.9, 20),
+    np.random.default_rng(3).uniform(-0.4, 0.4, 20),
+    unit="deg",
+)
+mock_radii = np.random.default_rng(4).uniform(1, 5, 20) * units.arcmin
+
+
+def _mock_catalog_matches(position, radius):
+    """The (sorted) names of the mock catalog objects within ``radius`` of ``position``."""
+    return sorted(
+        f"obj{i}" for i in np.flatnonzero(mock_catalog.separation(position) <= radius)
+    )
+
+
+def _mock_row_limit():
+    """A row limit which no single mock query reaches, but (most) combined queries do."""
+    return 1 + max(
+        len(_mock_catalog_matches(p, r)) for p, r in zip(mock_positions, mock_radii)
+    )
+
+
+@pytest.fixture()
+def mock_simbad(monkeypatch):
+    """
+    A :py:class:`SIMBAD` instance whose ``query_region`` calls are served (as a TAP union of cones) from the mock
+    catalog. ``calls`` records the number of centers in each request. ``options["coordinates"]`` sets the names of
+    the RA / DEC columns returned (``None`` for none) and ``options["row_limit"]`` truncates the output like the
+    service's ROW_LIMIT.
+    """
+    calls, options = [], {"coordinates": ("ra", "dec"), "row_limit": 0}
+
+    def query_region(coordinates, radius=2 * units.arcmin, **kwargs):
+        coordinates = coordinates.reshape((-1,))
+        radius = np.broadcast_to(units.Quantity(radius), coordinates.shape, subok=True)
+        calls.append(len(coordinates))
+
+        _mask = np.zeros(len(mock_catalog), dtype=bool)
+        for center, _radius in zip(coordinates, radius):
+            _mask |= mock_catalog.separation(center) <= _radius
+
+        _output = Table(
+            {
+                "main_id": [f"obj{i}" for i in np.flatnonzero(_mask)],
+                "OTYPES": ["|G|"] * int(_mask.sum()),
+            }
+        )
+        if options["coordinates"] is not None:
+            _ra, _dec = options["coordinates"]
+            _output[_ra], _output[_dec] = (
+                mock_catalog.ra.deg[_mask],
+                mock_catalog.dec.deg[_mask],
+            )
+        return _output[: options["row_limit"] or None]
+
+    monkeypatch.setattr(Simbad, "query_region", query_region)
+    monkeypatch.setattr(Simbad, "add_votable_fields", lambda *args, **kwargs: None)
+    monkeypatch.setattr(Simbad, "remove_votable_fields", lambda *args, **kwargs: None)
+
+    yield SimpleNamespace(
+        database=SIMBAD(query_config={"DISK_CACHE": False}),
+        calls=calls,
+        options=options,
+    )
+
+
+class TestSIMBADBatching:
+    """
+    Test the batched (vector) SIMBAD queries used when counting.
+    """
+
+    @staticmethod
+    def check_queries(queries):
+        assert len(queries) == len(mock_positions)
+        for query, position, radius in zip(queries, mock_positions, mock_radii):
+            assert sorted(query["main_id"]) == _mock_catalog_matches(position, radius)
+
+    def test_batched(self, mock_simbad):
+        """
+        A chunk of positions costs a single request and each position gets exactly its own matches.
+        """
+        queries = mock_simbad.database._query_radii(mock_positions, mock_radii)
+
+        assert mock_simbad.calls == [len(mock_positions)]
+        self.check_queries(queries)
+
+        # -- all of the positions are now cached -- #
+        mock_simbad.database._query_radii(mock_positions, mock_radii)
+        assert mock_simbad.calls == [len(mock_positions)]
+
+    def test_batched_empty(self, mock_simbad):
+        """
+        Positions without any objects still produce (empty) results.
+        """
+        _positions = SkyCoord([100, 101], [50, 51], unit="deg")
+        queries = mock_simbad.database._query_radii(_positions, [1, 1] * units.arcmin)
+
+        assert mock_simbad.calls == [2]
+        assert [len(query) for query in queries] == [0, 0]
+
+    def test_fallback_without_coordinates(self, mock_simbad):
+        """
+        If the rows can't be tied to their positions, the positions are queried one at a time from then on.
+        """
+        mock_simbad.options["coordinates"] = None
+        queries = mock_simbad.database._query_radii(mock_positions, mock_radii)
+
+        assert mock_simbad.calls == [len(mock_positions)] + [1] * len(mock_positions)
+        assert not mock_simbad.database._batch_queries
+        assert [len(query) for query in queries] == [
+            len(_mock_catalog_matches(p, r)) for p, r in zip(mock_positions, mock_radii)
+        ]
+
+        # -- no more wasted batch queries -- #
+        mock_simbad.calls.clear()
+        mock_simbad.database._query_radii(mock_positions[:5], mock_radii[:5] * 2)
+        assert mock_simbad.calls == [1] * 5
+
+    def test_fallback_row_limit(self, mock_simbad):
+        """
+        A batch which (may have) hit the ROW_LIMIT is re-queried position by position.
+        """
+        mock_simbad.database.ROW_LIMIT = mock_simbad.options[
+            "row_limit"
+        ] = _mock_row_limit()
+        queries = mock_simbad.database._query_radii(mock_positions, mock_radii)
+
+        assert mock_simbad.calls == [len(mock_positions)] + [1] * len(mock_positions)
+        self.check_queries(queries)
+
+
+# ======================================================================== #
+# Mocked NED source matching                                               #
+# ======================================================================== #
+@pytest.fixture()
+def mock_ned(monkeypatch):
+    """
+    A :py:class:`NED` instance (without query caches) whose ``query_region`` calls are served from the mock catalog.
+    ``make`` builds further instances with other configurations and ``calls`` records the number of requests.
+    """
+    calls = []
+
+    def query_region(coordinates, radius=2 * units.arcmin, **kwargs):
+        calls.append(1)
+        _index = np.flatnonzero(mock_catalog.separation(coordinates) <= radius)
+        return Table(
+            {
+                "No.": np.arange(len(_index)) + 1,
+                "Object Name": [f"obj{i}" for i in _index],
+                "RA": units.Quantity(mock_catalog.ra.deg[_index], "deg"),
+                "DEC": units.Quantity(mock_catalog.dec.deg[_index], "deg"),
+                "Type": ["G"] * len(_index),
+            }
+        )
+
+    monkeypatch.setattr(Ned, "query_region", query_region)
+
+    def make(**config):
+        return NED(query_config={"DISK_CACHE": False, "QUERY_CACHE_SIZE": 0, **config})
+
+    yield SimpleNamespace(database=make(), make=make, calls=calls)
+
+
+@pytest.fixture()
+def mock_source_table():
+    """A source table of the mock positions."""
+    return SourceTable(
+        {
+            "NAME": [f"src{i}" for i in range(len(mock_positions))],
+            "RA": units.Quantity(mock_positions.ra.deg, "deg"),
+            "DEC": units.Quantity(mock_positions.dec.deg, "deg"),
+        }
+    )
+
+
+def _read_matches(path, table_name, name_column="Object Name"):
+    """The (source, object) pairs written to ``table_name`` in the database at ``path``."""
+    with sql.create_engine(f"sqlite:///{path}").connect() as conn:
+        return sorted(
+            conn.execute(
+                sql.text(f'SELECT CATOBJ, "{name_column}" FROM {table_name}')
+            ).fetchall()
+        )
+
+
+def _expected_matches():
+    """The (source, object) pairs within the mock radii."""
+    return sorted(
+        (f"src{i}", name)
+        for i, (position, radius) in enumerate(zip(mock_positions, mock_radii))
+        for name in _mock_catalog_matches(position, radius)
+    )
+
+
+class TestRemoteSourceMatch:
+    """
+    Test :py:meth:`RemoteDatabase.source_match` against the mocked NED.
+    """
+
+    def test_writes_all_matches(self, mock_ned, mock_source_table, tmp_path):
+        """
+        Every match is written to the output table.
+        """
+        path = tmp_path / "matches.db"
+        mock_ned.database.source_match(
+            path,
+            mock_source_table,
+            search_radii=mock_radii,
+            parallel_kwargs={"max_workers": 4},
+        )
+
+        assert _read_matches(path, "NED_STD_MATCH") == _expected_matches()
+
+    def test_reuses_parallel_kwargs(self, mock_ned, mock_source_table, tmp_path):
+        """
+        The caller's parallel kwargs aren't consumed by a match, so they apply to the next one as well.
+        """
+        parallel_kwargs = {"max_workers": 4}
+        for name in ("first.db", "second.db"):
+            mock_ned.database.source_match(
+                tmp_path / name,
+                mock_source_table,
+                search_radii=mock_radii,
+                parallel_kwargs=parallel_kwargs,
+            )
+            assert parallel_kwargs == {"max_workers": 4}
+
+        assert _read_matches(tmp_path / "second.db", "NED_STD_MATCH") == (
+            _expected_matches()
+        )
+
+    def test_appends_to_existing_table(self, mock_ned, mock_source_table, tmp_path):
+        """
+        Matching into an existing match table appends to it.
+        """
+        path = tmp_path / "matches.db"
+        for _ in range(2):
+            mock_ned.database.source_match(
+                path, mock_source_table, search_radii=mock_radii
+            )
+
+        assert _read_matches(path, "NED_STD_MATCH") == sorted(2 * _expected_matches())
+
+    def test_clustered_matches_unclustered(self, mock_ned, mock_source_table, tmp_path):
+        """
+        Clustering the queries changes the number of requests, but not the matches.
+        """
+        mock_ned.database.CLUSTER_QUERIES = True
+        mock_ned.database.source_match(
+            tmp_path / "clustered.db", mock_source_table, search_radii=mock_radii
+        )
+        n_clustered = len(mock_ned.calls)
+
+        assert n_clustered < len(mock_positions)
+        assert _read_matches(tmp_path / "clustered.db", "NED_STD_MATCH") == (
+            _expected_matches()
+        )
+
+        mock_ned.database.CLUSTER_QUERIES = False
+        mock_ned.database.source_match(
+            tmp_path / "unclustered.db", mock_source_table, search_radii=mock_radii
+        )
+
+        assert len(mock_ned.calls) - n_clustered == len(mock_positions)
+        assert _read_matches(tmp_path / "unclustered.db", "NED_STD_MATCH") == (
+            _expected_matches()
+        )
+
+    def test_clustered_row_limit(self, mock_simbad, mock_source_table, tmp_path):
+        """
+        Clustered queries which hit the row limit fall back to one query per source.
+        """
+        mock_simbad.options["coordinates"] = (
+            mock_simbad.database.query_schema.RA,
+            mock_simbad.database.query_schema.DEC,
+        )
+        mock_simbad.database.CLUSTER_QUERIES = True
+        mock_simbad.database.ROW_LIMIT = mock_simbad.options[
+            "row_limit"
+        ] = _mock_row_limit()
+        mock_simbad.database.source_match(
+            tmp_path / "matches.db", mock_source_table, search_radii=mock_radii
+        )
+
+        assert _read_matches(
+            tmp_path / "matches.db", "SIMBAD_STD_MATCH", "main_id"
+        ) == (_expected_matches())
+
+    def test_write_failure_raises(self, mock_ned, mock_source_table, tmp_path):
+        """
+        A failure to write the matches is raised once the queries are done instead of being dropped.
+        """
+        path = tmp_path / "matches.db"
+        with sql.create_engine(f"sqlite:///{path}").begin() as conn:
+            conn.execute(sql.text("CREATE TABLE NED_STD_MATCH (X INTEGER)"))
+
+        with pytest.raises(DatabaseError):
+            mock_ned.database.source_match(
+                path, mock_source_table, search_radii=mock_radii
+            )
+
+
+class TestQueryCache:
+    """
+    Test the in-memory and on-disk caches of parsed query results.
+    """
+
+    def test_memory_cache(self, mock_ned):
+        """
+        Repeated queries are served from memory, the least recently used results are evicted and callers get copies.
+        """
+        database = mock_ned.make(QUERY_CACHE_SIZE=2)
+        for position in mock_positions[:3]:
+            database.query_radius(position, 5 * units.arcmin)
+        assert len(mock_ned.calls) == 3
+
+        query = database.query_radius(mock_positions[2], 5 * units.arcmin)
+        query["NEW"] = 1
+        assert len(mock_ned.calls) == 3
+        assert (
+            "NEW"
+            not in database.query_radius(mock_positions[2], 5 * units.arcmin).colnames
+        )
+
+        database.query_radius(mock_positions[0], 5 * units.arcmin)  # --> evicted
+        assert len(mock_ned.calls) == 4
+
+    def test_disk_cache(self, mock_ned, tmp_path):
+        """
+        Results written to disk are served to later instances.
+        """
+        database = mock_ned.make(DISK_CACHE=True, DISK_CACHE_DIRECTORY=str(tmp_path))
+        query = database.query_radius(mock_positions[0], 5 * units.arcmin)
+
+        database = mock_ned.make(DISK_CACHE=True, DISK_CACHE_DIRECTORY=str(tmp_path))
+        cached_query = database.query_radius(mock_positions[0], 5 * units.arcmin)
+
+        assert len(mock_ned.calls) == 1
+        assert list(cached_query["Object Name"]) == list(query["Object Name"])
+        assert np.allclose(cached_query["RA"], query["RA"])
+
+        database.clear_query_cache()
+        database.query_radius(mock_positions[0], 5 * units.arcmin)
+        assert len(mock_ned.calls) == 2
+
+    def test_disk_cache_expiry(self, mock_ned, tmp_path):
+        """
+        Expired results are queried again.
+        """
+        database = mock_ned.make(
+            DISK_CACHE=True, DISK_CACHE_DIRECTORY=str(tmp_path), DISK_CACHE_TTL=-1
+        )
+        database.query_radius(mock_positions[0], 5 * units.arcmin)
+        database.query_radius(mock_positions[0], 5 * units.arcmin)
+
+        assert len(mock_ned.calls) == 2
+
+    def test_disk_cache_size(self, mock_ned, tmp_path):
+        """
+        The disk cache keeps at most DISK_CACHE_SIZE results, dropping the least recently used.
+        """
+        database = mock_ned.make(
+            DISK_CACHE=True, DISK_CACHE_DIRECTORY=str(tmp_path), DISK_CACHE_SIZE=2
+        )
+        for position in mock_positions[:3]:
+            database.query_radius(position, 5 * units.arcmin)
+
+        with database._disk_cache.connect() as conn:
+            assert conn.execute(sql.text("SELECT COUNT(*) FROM QUERIES")).scalar() == 2
+
+        database.query_radius(mock_positions[0], 5 * units.arcmin)
+        assert len(mock_ned.calls) == 4
+
+    def test_disk_cache_unusable(self, mock_ned, tmp_path):
+        """
+        If the cache directory can't be created, queries still succeed without the disk cache.
+        """
+        (tmp_path / "file").write_text("")
+        database = mock_ned.make(
+            DISK_CACHE=True, DISK_CACHE_DIRECTORY=str(tmp_path / "file" / "cache")
+        )
+
+        for _ in range(2):
+            database.query_radius(mock_positions[0], 5 * units.arcmin)
+
+        assert database._disk_cache is None
+        assert len(mock_ned.calls) == 2
+
+
+class TestRandomSampleCount:
+    """
+    Test the reproducibility of the random count samples.
+    """
+
+    @pytest.fixture(autouse=True)
+    def _positions_only(self, mock_ned, monkeypatch):
+        # the counts themselves aren't under test; only the sampled positions are returned.
+        def count(positions, radii, parallel_kwargs=None):
+            return Table({"RA": positions.ra.deg, "DEC": positions.dec.deg})
+
+        monkeypatch.setattr(mock_ned.database, "count", count)
+
+    def test_global_seed(self, mock_ned):
+        """
+        Test that the sample follows the global numpy seed when no generator is given.
+        """
+        np.random.seed(1)
+        _first = mock_ned.database.random_sample_count(5, 1 * units.arcmin)
+        np.random.seed(1)
+        _second = mock_ned.database.random_sample_count(5, 1 * units.arcmin)
+
+        assert np.array_equal(_first["RA"], _second["RA"])
+        assert np.array_equal(_first["DEC"], _second["DEC"])
+
+    def test_rng(self, mock_ned):
+        """
+        Test that a seed / generator makes the sample reproducible.
+        """
+        _first = mock_ned.database.random_sample_count(5, 1 * units.arcmin, rng=3)
+        _second = mock_ned.database.random_sample_count(
+            5, 1 * units.arcmin, rng=np.random.default_rng(3)
+        )
+
+        assert np.array_equal(_first["RA"], _second["RA"])
+
+    def test_add_sources_to_poisson(self, mock_ned, tmp_path):
+        """
+        Test that the generator is passed through when adding sources to the Poisson atlas.
+        """
+        from pyXMIP.structures.map import PoissonAtlas
+
+        _expected = mock_ned.database.random_sample_count(5, 1 * units.arcmin, rng=3)
+
+        PoissonAtlas.generate(tmp_path / "poisson.fits", 0.1, database="NED").close()
+        mock_ned.database.poisson_atlas = str(tmp_path / "poisson.fits")
+        mock_ned.database.add_sources_to_poisson(5, 1 * units.arcmin, rng=3)
+
+        _atlas = mock_ned.database.poisson_atlas
+        assert np.allclose(_atlas.COUNTS["RA"], _expected["RA"])
+        _atlas.close()
+
+
+class TestLocalSourceMatch:
+    """
+    Test matching against a local database.
+    """
+
+    @pytest.fixture()
+    def local_database(self):
+        _table = SourceTable(
+            {
+                "NAME": [f"obj{i}" for i in range(len(mock_catalog))],
+                "RA": units.Quantity(mock_catalog.ra.deg, "deg"),
+                "DEC": units.Quantity(mock_catalog.dec.deg, "deg"),
+            }
+        )
+        yield LocalDatabase(_table, "LOCAL")
+
+    def test_matches(self, local_database, mock_source_table):
+        """
+        Test that every (source, object) pair within the search radius is matched.
+        """
+        _radius = 3 * units.arcmin
+        _matches = local_database.source_match_memory(mock_source_table, _radius)
+
+        _sep = mock_positions[:, None].separation(mock_catalog[None, :])
+        _src, _obj = np.nonzero(_sep <= _radius)
+
+        assert sorted(zip(_matches["CATOBJ"], _matches["NAME"])) == sorted(
+            (f"src{i}", f"obj{j}") for i, j in zip(_src, _obj)
+        )
+
+    def test_catnmatch(self, local_database, mock_source_table):
+        """
+        Test that the number of matches per source is that of the (old) masked count over the match list.
+        """
+        _radius = 3 * units.arcmin
+        _matches = local_database.source_match_memory(mock_source_table, _radius)
+
+        (
+            idxother,
+            idxself,
+            _,
+            _,
+        ) = local_database.table.get_coordinates().search_around_sky(
+            mock_source_table.get_coordinates(), _radius
+        )
+        _expected = [len(list(set(idxself[idxother == idxo]))) for idxo in idxother]
+
+        assert len(_expected) > len(mock_positions)
+        assert list(_matches["CATNMATCH"]) == _expected
+
+
+class TestClusterQueryRegions:
+    """
+    Test the grouping of query regions for clustered queries.
+    """
+
+    def test_partition(self):
+        """
+        Test that every region is in exactly one group, and the regions of each group are close.
+        """
+        _radii = mock_radii
+        _groups = _cluster_query_regions(
+            mock_positions.ra.deg, mock_positions.dec.deg, _radii
+        )
+
+        assert sorted(np.concatenate(_groups)) == list(range(len(mock_positions)))
+        for group in _groups:
+            _group_positions = mock_positions[group]
+            _separations = _group_positions[:, None].separation(
+                _group_positions[None, :]
+            )
+            assert np.amax(_separations) < 4 * np.amax(_radii)
+
+    def test_groups(self):
+        """
+        Test that identical regions are grouped and distant ones are not.
+        """
+        _ras, _decs = np.array([10.0, 10.0, 200.0]), np.array([0.0, 0.0, -45.0])
+        _groups = _cluster_query_regions(_ras, _decs, [1, 1, 1] * units.arcmin)
+
+        assert sorted(sorted(group) for group in _groups) == [[0, 1], [2]]
+
+    def test_zero_radius(self):
+        """
+        Test that regions without a radius are only grouped with identical positions.
+        """
+        _ras, _decs = np.array([10.0, 10.0, 10.001]), np.array([0.0, 0.0, 0.0])
+        _groups = _cluster_query_regions(_ras, _decs, [0, 0, 0] * units.arcmin)
+
+        assert sorted(sorted(group) for group in _groups) == [[0, 1], [2]]
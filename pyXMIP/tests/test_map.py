@@ -0,0 +1,286 @@
+"""
+Testing module for pyXMIP's atlases and maps.
+"""
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from astropy import units
+from astropy.io import fits
+from astropy.table import Table
+
+from pyXMIP.structures.map import PoissonAtlas, StatAtlas, _resolution_to_nside
+from pyXMIP.utilities.core import bin_directory
+
+
+def _count_table(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return Table(
+        {
+            "RA": rng.uniform(0, 360, n),
+            "DEC": rng.uniform(-90, 90, n),
+            "G": rng.integers(0, 10, n),
+        }
+    )
+
+
+def _write_in_same_tick(path, write):
+    # perform a write, then roll the mtime back so that it can't be told apart from the file that was read.
+    _stat = os.stat(path)
+    write()
+    os.utime(path, ns=(_stat.st_atime_ns, _stat.st_mtime_ns))
+
+
+@pytest.fixture
+def atlas(tmp_path):
+    _atlas = StatAtlas.generate(tmp_path / "atlas.fits", 0.1)
+    yield _atlas
+    _atlas.close()
+
+
+class TestAtlasReadAfterWrite:
+    """
+    Test that the cached file handle of an atlas never serves stale data after a write.
+    """
+
+    def test_header(self, atlas):
+        """
+        Test that header edits are seen by this atlas and by new ones.
+        """
+        assert atlas.CSYS == "ICRS"
+
+        _write_in_same_tick(atlas.path, lambda: setattr(atlas, "CSYS", "Galactic"))
+
+        assert atlas.CSYS == "Galactic"
+        assert atlas._hudl[0].header["CSYS"] == "Galactic"
+        assert StatAtlas(atlas.path).CSYS == "Galactic"
+
+    def test_map_names(self, atlas):
+        """
+        Test that written maps show up in the map names.
+        """
+        assert atlas.map_names == []
+
+        _map = SimpleNamespace(map=np.zeros(atlas.NPIX), method="TEST")
+        _write_in_same_tick(
+            atlas.path, lambda: atlas._write_build_output_to_fits("G", _map)
+        )
+
+        assert atlas.map_names == ["G"]
+        assert atlas.has_maps
+
+    def test_counts(self, atlas):
+        """
+        Test that appended rows show up in the COUNTS table.
+        """
+        atlas.append_to_fits(_count_table(10), "COUNTS")
+        assert len(atlas) == 10
+
+        _write_in_same_tick(
+            atlas.path, lambda: atlas.append_to_fits(_count_table(5, 1), "COUNTS")
+        )
+
+        assert len(atlas) == 15
+        assert len(atlas.COUNTS) == 15
+
+    def test_reshape(self, atlas):
+        """
+        Test that the HEALPix geometry is re-read after a reshape.
+        """
+        _nside = atlas.NSIDE
+
+        _write_in_same_tick(atlas.path, lambda: atlas.reshape_healpix(0.01))
+
+        assert atlas.NSIDE != _nside
+        assert atlas.NPIX == 12 * atlas.NSIDE**2
+        assert atlas._hudl[0].header["NSIDE"] == atlas.NSIDE
+
+
+class TestGetPoints:
+    """
+    Test the cached output of :py:meth:`StatAtlas.get_points`.
+    """
+
+    def test_cached(self, atlas):
+        """
+        Test that repeated calls share the cached columns but not the table.
+        """
+        atlas.append_to_fits(_count_table(10), "COUNTS")
+
+        _first, _second = atlas.get_points(), atlas.get_points()
+        _first["NEW"] = 1
+
+        assert np.shares_memory(_first["PIX_ID"], _second["PIX_ID"])
+        assert "NEW" not in _second.colnames
+
+    def test_append(self, atlas):
+        """
+        Test that appended rows are seen, even if the mtime doesn't change.
+        """
+        atlas.append_to_fits(_count_table(10), "COUNTS")
+        assert len(atlas.get_points()) == 10
+
+        _write_in_same_tick(
+            atlas.path, lambda: atlas.append_to_fits(_count_table(5, 1), "COUNTS")
+        )
+
+        _points = atlas.get_points()
+        assert len(_points) == 15
+        assert np.array_equal(_points["RA"][10:], _count_table(5, 1)["RA"])
+
+    def test_reshape(self, atlas):
+        """
+        Test that the pixels are recomputed on the new grid after a reshape.
+        """
+        atlas.append_to_fits(_count_table(10), "COUNTS")
+        _pix_id = atlas.get_points()["PIX_ID"]
+
+        _write_in_same_tick(atlas.path, lambda: atlas.reshape_healpix(0.01))
+
+        _new_pix_id = atlas.get_points()["PIX_ID"]
+        assert not np.array_equal(_new_pix_id, _pix_id)
+        assert np.all(_new_pix_id < atlas.NPIX)
+
+
+class TestResolution:
+    """
+    Test the mapping from resolutions to HEALPix grids.
+    """
+
+    @pytest.mark.parametrize(
+        "resolution,nside,nside_power_of_two",
+        [(1 * units.deg, 34, 64), (0.1, 6, 8), (0.01, 58, 64), (10, 1, 1)],
+    )
+    def test_resolution_to_nside(self, resolution, nside, nside_power_of_two):
+        """
+        Test the default and power of 2 NSIDE for a resolution.
+        """
+        resolution = units.Quantity(resolution, units.rad).to_value(units.rad)
+
+        assert _resolution_to_nside(resolution) == nside
+        assert _resolution_to_nside(resolution, power_of_two=True) == nside_power_of_two
+
+    def test_bundled_atlas(self):
+        """
+        Test that the bundled atlases are on the grid their resolution maps to.
+        """
+        _header = fits.getheader(bin_directory / "psn_maps" / "NED.poisson.fits")
+
+        assert _resolution_to_nside(_header["RES"]) == _header["NSIDE"]
+
+    def test_generate(self, tmp_path):
+        """
+        Test that generated atlases use the mapping.
+        """
+        _atlas = StatAtlas.generate(tmp_path / "default.fits", 1 * units.deg)
+        _atlas_p2 = StatAtlas.generate(
+            tmp_path / "p2.fits", 1 * units.deg, power_of_two=True
+        )
+
+        assert (_atlas.NSIDE, _atlas.NPIX) == (34, 12 * 34**2)
+        assert (_atlas_p2.NSIDE, _atlas_p2.NPIX) == (64, 12 * 64**2)
+
+        _atlas.reshape_healpix(0.01, power_of_two=True)
+        assert _atlas.NSIDE == 64
+
+        _atlas.close(), _atlas_p2.close()
+
+
+class TestMAPEstimate:
+    """
+    Test the analytic MAP estimate of the Poisson maps.
+    """
+
+    def test_estimate(self):
+        """
+        Test the estimate against the total counts over the total area in each pixel.
+        """
+        from pyXMIP.stats.map_regression import BayesianPoissonMapRegressor
+
+        _table = Table({"PIX_ID": [0, 0, 2], "G": [1, 3, 5], "RAD": [1.0, 1.0, 2.0]})
+        _estimate = BayesianPoissonMapRegressor().build_map_MAP(_table, "G")
+
+        assert np.allclose(_estimate, [4 / (2 * np.pi), 0, 5 / (4 * np.pi)])
+
+    def test_mp_kwargs_deprecated(self):
+        """
+        Test that passing mp_kwargs warns but doesn't change the estimate.
+        """
+        from pyXMIP.stats.map_regression import BayesianPoissonMapRegressor
+
+        _table = Table({"PIX_ID": [0, 1], "G": [1, 3], "RAD": [1.0, 1.0]})
+        _regressor = BayesianPoissonMapRegressor()
+
+        with pytest.warns(DeprecationWarning):
+            _estimate = _regressor.build_map_MAP(
+                _table, "G", mp_kwargs={"multiprocess": False}
+            )
+
+        assert np.array_equal(_estimate, _regressor.build_map_MAP(_table, "G"))
+
+
+class TestRegressorPoints:
+    """
+    Test the positions / densities the regressors are fitted to.
+    """
+
+    @staticmethod
+    def _table(n, seed=0):
+        _table = _count_table(n, seed)
+        _table["RAD"] = np.full(n, 2.0)
+        return _table
+
+    def test_table_edited_in_place(self):
+        """
+        Test that rows added or changed in place are always seen.
+        """
+        from pyXMIP.stats.map_regression import KNNeighborMapRegressor
+
+        _regressor, _table = KNNeighborMapRegressor(), self._table(50)
+        X, Y = _regressor._sanitize_points(_table, "G")
+        assert (X.shape, Y.shape) == ((50, 2), (50,))
+
+        _table.add_row({"RA": 10.0, "DEC": 20.0, "G": 4, "RAD": 1.0})
+        X, Y = _regressor._sanitize_points(_table, "G")
+        assert (X.shape, Y.shape) == ((51, 2), (51,))
+        assert np.isclose(Y[-1], 4 / np.pi)
+
+        _table["RAD"][0] = 1.0
+        _, Y = _regressor._sanitize_points(_table, "G")
+        assert np.isclose(Y[0], _table["G"][0] / np.pi)
+
+    def test_shared_positions_and_areas(self):
+        """
+        Test that passing precomputed positions / areas gives the same points.
+        """
+        from pyXMIP.stats.map_regression import KNNeighborMapRegressor
+
+        _regressor, _table = KNNeighborMapRegressor(), self._table(50)
+        _shared = _regressor.get_positions_and_areas(_table)
+
+        for _expected, _value in zip(
+            _regressor._sanitize_points(_table, "G"),
+            _regressor._sanitize_points(_table, "G", _shared),
+        ):
+            assert np.array_equal(_expected, _value)
+
+    def test_build_map(self, tmp_path):
+        """
+        Test that a regressor map can be built from the atlas counts.
+        """
+        from pyXMIP.stats.map_regression import KNNeighborMapRegressor
+
+        atlas = PoissonAtlas.generate(tmp_path / "poisson.fits", 0.1)
+        atlas.append_to_fits(self._table(200), "COUNTS")
+        _output = atlas.build_poisson_map_regressor(
+            KNNeighborMapRegressor(),
+            "G",
+            param_kw={"n_neighbors": np.array([5, 10])},
+            cv_kw={"cv": 2},
+            training_kw={"random_state": 0},
+        )
+
+        assert _output.map.shape == (atlas.NPIX,)
+        assert np.all(np.isfinite(_output.map))
+        atlas.close()
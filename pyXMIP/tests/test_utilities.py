@@ -0,0 +1,256 @@
+"""
+Testing module for pyXMIP's utilities.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from astropy.coordinates import SkyCoord
+
+from pyXMIP.utilities import optimize
+from pyXMIP.utilities.geo import angular_separation, transform_frame_coordinates
+from pyXMIP.utilities.optimize import _RateLimiter, map_to_threads
+
+
+class TestGeo:
+    """
+    Test the array coordinate utilities against :py:mod:`astropy.coordinates`.
+    """
+
+    @pytest.fixture()
+    def positions(self):
+        rng = np.random.default_rng(0)
+        _lon, _lat = rng.uniform(0, 2 * np.pi, 500), np.arcsin(rng.uniform(-1, 1, 500))
+        # include the poles, the wrap in longitude, and identical points.
+        _lon = np.concatenate([_lon, [0, 0, 2 * np.pi - 1e-12, 1.0]])
+        _lat = np.concatenate([_lat, [np.pi / 2, -np.pi / 2, 0, 0.5]])
+        yield _lon, _lat
+
+    def test_angular_separation(self, positions):
+        """
+        Test the separations against :py:meth:`SkyCoord.separation`, for small and large separations.
+        """
+        _lon, _lat = positions
+        _first = SkyCoord(_lon, _lat, unit="rad")
+
+        for _offset in (1e-7, 1e-3, 1.0):
+            _lon2, _lat2 = _lon + _offset, np.clip(
+                _lat - _offset, -np.pi / 2, np.pi / 2
+            )
+            _expected = _first.separation(SkyCoord(_lon2, _lat2, unit="rad")).rad
+
+            np.testing.assert_allclose(
+                angular_separation(_lon, _lat, _lon2, _lat2),
+                _expected,
+                rtol=1e-7,
+                atol=1e-12,
+            )
+
+        assert angular_separation(1.0, 0.5, 1.0, 0.5) == 0
+
+    def test_angular_separation_broadcast(self, positions):
+        """
+        Test that a single position is broadcast against many.
+        """
+        _lon, _lat = positions
+
+        np.testing.assert_allclose(
+            angular_separation(0.0, 0.0, _lon, _lat),
+            angular_separation(np.zeros_like(_lon), np.zeros_like(_lat), _lon, _lat),
+        )
+
+    @pytest.mark.parametrize(
+        "from_frame,to_frame",
+        [
+            ("icrs", "galactic"),
+            ("galactic", "icrs"),
+            ("ICRS", "Galactic"),
+            ("fk5", "supergalactic"),
+            ("icrs", "icrs"),
+            ("icrs", "fk4"),
+        ],
+    )
+    def test_transform_frame_coordinates(self, positions, from_frame, to_frame):
+        """
+        Test the transformations (rotations and astropy fallbacks) against :py:meth:`SkyCoord.transform_to`.
+        """
+        _lon, _lat = positions
+        _expected = SkyCoord(
+            _lon, _lat, unit="rad", frame=from_frame.lower()
+        ).transform_to(to_frame.lower())
+        _expected = _expected.spherical
+
+        _out_lon, _out_lat = transform_frame_coordinates(
+            _lon, _lat, from_frame, to_frame
+        )
+
+        assert np.all((_out_lon >= 0) & (_out_lon < 2 * np.pi))
+        assert (
+            np.amax(
+                angular_separation(
+                    _out_lon, _out_lat, _expected.lon.rad, _expected.lat.rad
+                )
+            )
+            < 1e-9
+        )
+
+
+class TestMapToThreads:
+    """
+    Test :py:func:`pyXMIP.utilities.optimize.map_to_threads`.
+    """
+
+    @staticmethod
+    def _slow_square(i, delay):
+        time.sleep(delay)
+        return i * i
+
+    @pytest.mark.parametrize(
+        "threading_kw",
+        [
+            None,
+            {"max_workers": 1},
+            {"max_workers": 4},
+            {"max_workers": 4, "max_in_flight": 2},
+        ],
+    )
+    def test_ordering(self, threading_kw):
+        """
+        Test that the results are in the order of the arguments, even when the tasks finish out of order.
+        """
+        _args = list(range(20))
+        _delays = [0.02 * ((-i) % 4) for i in _args]
+
+        _results = map_to_threads(
+            self._slow_square, _args, _delays, threading_kw=threading_kw
+        )
+
+        assert _results == [i * i for i in _args]
+
+    @pytest.mark.parametrize("max_workers", [1, 4])
+    def test_eager(self, max_workers):
+        """
+        Test that every task has run by the time the results are returned, whatever the number of threads.
+        """
+        _ran = []
+        _results = map_to_threads(
+            _ran.append, range(10), threading_kw={"max_workers": max_workers}
+        )
+
+        assert isinstance(_results, list)
+        assert sorted(_ran) == list(range(10))
+
+    def test_threading_kw_unchanged(self):
+        """
+        Test that the caller's threading options aren't consumed, so the dict can be reused.
+        """
+        _threading_kw = {
+            "max_workers": 2,
+            "max_in_flight": 2,
+            "thread_name_prefix": "pyxmip-test",
+        }
+        _expected = dict(_threading_kw)
+
+        for _ in range(2):
+            map_to_threads(abs, range(-4, 4), threading_kw=_threading_kw)
+            assert _threading_kw == _expected
+
+    def test_threads(self):
+        """
+        Test that the tasks run concurrently in worker threads, bounded by max_workers.
+        """
+        _threads, _lock = set(), threading.Lock()
+        # every task waits for two others, so this only completes if three of them run at once.
+        _barrier = threading.Barrier(3, timeout=30)
+
+        def _record(i):
+            with _lock:
+                _threads.add(threading.current_thread().name)
+            _barrier.wait()
+            return i
+
+        _results = map_to_threads(
+            _record,
+            range(9),
+            threading_kw={"max_workers": 3, "thread_name_prefix": "pyxmip-test"},
+        )
+
+        assert _results == list(range(9))
+        assert len(_threads) == 3
+        assert all(name.startswith("pyxmip-test") for name in _threads)
+
+    def test_exceptions(self):
+        """
+        Test that exceptions in the tasks are raised to the caller.
+        """
+
+        def _fail(i):
+            if i == 3:
+                raise RuntimeError("failed")
+            return i
+
+        with pytest.raises(RuntimeError):
+            map_to_threads(_fail, range(8), threading_kw={"max_workers": 2})
+
+
+class TestRateLimiter:
+    """
+    Test the token bucket limiting the rate of remote requests.
+
+    The clock is frozen (and only moved by the tests), so the waits are exact and don't depend on the load.
+    """
+
+    @pytest.fixture()
+    def clock(self, monkeypatch):
+        _clock = SimpleNamespace(now=0.0, sleeps=[])
+        _lock = threading.Lock()
+
+        def sleep(seconds):
+            with _lock:
+                _clock.sleeps.append(seconds)
+
+        monkeypatch.setattr(
+            optimize, "time", SimpleNamespace(monotonic=lambda: _clock.now, sleep=sleep)
+        )
+        yield _clock
+
+    def test_rate(self, clock):
+        """
+        Test that requests beyond the burst wait for their token at the rate.
+        """
+        _limiter = _RateLimiter(rate=50, burst=1)
+        for _ in range(6):
+            _limiter.acquire()
+
+        assert np.allclose(clock.sleeps, [k / 50 for k in range(1, 6)])
+
+    def test_burst(self, clock):
+        """
+        Test that a full bucket serves a burst of requests without waiting, and refills over time.
+        """
+        _limiter = _RateLimiter(rate=1, burst=5)
+        for _ in range(5):
+            _limiter.acquire()
+        assert clock.sleeps == []
+
+        _limiter.acquire()
+        assert np.allclose(clock.sleeps, [1])
+
+        clock.now += 10
+        clock.sleeps.clear()
+        for _ in range(5):
+            _limiter.acquire()
+        assert clock.sleeps == []
+
+    def test_threads(self, clock):
+        """
+        Test that requests from several threads each reserve their own token.
+        """
+        _limiter = _RateLimiter(rate=50, burst=1)
+        map_to_threads(
+            lambda _: _limiter.acquire(), range(12), threading_kw={"max_workers": 4}
+        )
+
+        assert np.allclose(sorted(clock.sleeps), [k / 50 for k in range(1, 12)])
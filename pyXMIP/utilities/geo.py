@@ -16,12 +16,18 @@ In pyXMIP, coordinates are specified in 1 of 3 systems:
 - **Coordinate Convention**: This is the convention for all the astronomical coordinate systems. These obey longitude and
   latitude as it is typically defined with longitude increasing to the east from 0 to 360 degrees.
 """
+from functools import lru_cache
+
 import numpy as np
+from astropy import units
 
 # ================================================================================= #
 # COORDINATE MANAGEMENT                                                             #
 # ================================================================================= #
 
+# Pre-built angle constants; avoids re-parsing unit strings on each conversion.
+_WRAP_ANGLE = 180 * units.deg
+
 sky_coordinate_systems = {
     "latlon": {"phi": (-np.pi, "east"), "theta": (-np.pi / 2, "north")},
     "healpix": {"phi": (-np.pi, "east"), "theta": (np.pi, "south")},
@@ -74,8 +80,130 @@ def convert_coordinates(phi, theta, from_system="healpix", to_system="latlon"):
 def convert_skycoord(skycoord, to_system):
     # skycoords always go straight to latlon
     phi, theta = (
-        skycoord.frame.spherical.lon.wrap_at("180 deg").rad,
+        skycoord.frame.spherical.lon.wrap_at(_WRAP_ANGLE).rad,
         skycoord.frame.spherical.lat.rad,
     )
 
     return convert_coordinates(phi, theta, from_system="latlon", to_system=to_system)
+
+
+# ================================================================================= #
+# FRAME TRANSFORMATIONS                                                             #
+# ================================================================================= #
+# Frames whose mutual transformations (at default frame attributes) are pure rotations of the unit sphere.
+rotation_frames = ("icrs", "fk5", "galactic", "supergalactic")
+
+
+@lru_cache(maxsize=None)
+def get_rotation_matrix(from_frame, to_frame):
+    r"""
+    Compute the :math:`3\times 3` rotation matrix taking cartesian unit vectors in ``from_frame`` to ``to_frame``.
+
+    Parameters
+    ----------
+    from_frame: str
+        The name of the frame to rotate from. Must be in :py:data:`rotation_frames`.
+    to_frame: str
+        The name of the frame to rotate to. Must be in :py:data:`rotation_frames`.
+
+    Returns
+    -------
+    array
+        The ``(3,3)`` rotation matrix.
+    """
+    from astropy.coordinates import CartesianRepresentation, SkyCoord
+
+    assert (
+        from_frame in rotation_frames and to_frame in rotation_frames
+    ), f"Cannot represent {from_frame} -> {to_frame} as a rotation."
+
+    # The columns of the matrix are the images of the basis vectors.
+    basis = SkyCoord(CartesianRepresentation(np.eye(3)), frame=from_frame)
+    return np.array(basis.transform_to(to_frame).cartesian.xyz)
+
+
+def transform_frame_coordinates(lon, lat, from_frame, to_frame):
+    r"""
+    Transform longitude / latitude arrays (in radians) between two astronomical frames.
+
+    Parameters
+    ----------
+    lon: array
+        The longitudes (radians) in ``from_frame``.
+    lat: array
+        The latitudes (radians) in ``from_frame``.
+    from_frame: str
+        The name of the starting frame.
+    to_frame: str
+        The name of the final frame.
+
+    Returns
+    -------
+    lon: array
+        The longitudes (radians, :math:`[0,2\pi)`) in ``to_frame``.
+    lat: array
+        The latitudes (radians) in ``to_frame``.
+
+    Notes
+    -----
+    When both frames are in :py:data:`rotation_frames`, the transformation is a single matrix product on the unit
+    vectors, which avoids constructing :py:class:`astropy.coordinates.SkyCoord` objects for large arrays. Otherwise, the
+    transformation falls back on :py:mod:`astropy.coordinates`.
+    """
+    from_frame, to_frame = from_frame.lower(), to_frame.lower()
+
+    if from_frame == to_frame:
+        return lon, lat
+
+    if from_frame not in rotation_frames or to_frame not in rotation_frames:
+        from astropy.coordinates import SkyCoord
+
+        positions = SkyCoord(lon, lat, frame=from_frame, unit=units.rad).transform_to(
+            to_frame
+        )
+        return (
+            positions.frame.spherical.lon.rad,
+            positions.frame.spherical.lat.rad,
+        )
+
+    cos_lat = np.cos(lat)
+    xyz = np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+    x, y, z = get_rotation_matrix(from_frame, to_frame) @ xyz
+
+    return np.mod(np.arctan2(y, x), 2 * np.pi), np.arcsin(np.clip(z, -1, 1))
+
+
+def angular_separation(lon1, lat1, lon2, lat2):
+    r"""
+    Compute the angular separation (in radians) between two sets of longitude / latitude positions (in radians).
+
+    Parameters
+    ----------
+    lon1, lat1: array
+        The first set of positions (radians).
+    lon2, lat2: array
+        The second set of positions (radians). These are broadcast against the first set.
+
+    Returns
+    -------
+    array
+        The angular separations (radians).
+
+    Notes
+    -----
+    This is the haversine formula,
+
+    .. math::
+
+        \Delta\sigma = 2 \sin^{-1}\sqrt{\sin^2\left(\frac{\Delta\delta}{2}\right) + \cos \delta_1 \cos \delta_2 \sin^2 \left(\frac{\Delta \alpha}{2}\right)},
+
+    evaluated directly on the arrays. It is well conditioned for the small separations of positional matching and
+    avoids the frame and unit handling of :py:meth:`astropy.coordinates.SkyCoord.separation`.
+    """
+    _h = np.asarray(np.sin(np.subtract(lat2, lat1) / 2) ** 2, dtype="float64")
+    _h += np.cos(lat1) * np.cos(lat2) * np.sin(np.subtract(lon2, lon1) / 2) ** 2
+    np.clip(_h, 0, 1, out=_h)
+    np.sqrt(_h, out=_h)
+    np.arcsin(_h, out=_h)
+    _h *= 2
+    return _h
@@ -1,6 +1,8 @@
 """
 Utility module for optimized operations on datasets or via parallelism
 """
+import threading
+import time
 from multiprocessing.shared_memory import SharedMemory
 from typing import Callable, Collection, Iterator, TypeVar
 
@@ -54,7 +56,7 @@ def created_shared_memory_equivalent(array: np.ndarray) -> SharedMemory:
 
 def map_to_threads(
     mappable: Callable[[...], ...], *args, threading_kw: dict = None
-) -> Iterator | map:
+) -> list:
     """
     Map a function (``mappable``) with arguments ``*args`` to threads or run without threads if threading is
     not enabled.
@@ -66,44 +68,82 @@ def map_to_threads(
     *args:
         Arguments to pass through ``mappable``. These would be any of the standard arguments.
     threading_kw: dict
-        Dictionary containing the threading parameters. TODO: threading kwargs.
+        Dictionary containing the threading parameters. The following are recognized:
+
+        - ``max_workers``: The number of threads to use. If ``1`` (default), no threads are used. If ``None``, the
+          ``ThreadPoolExecutor`` default of ``min(32, os.cpu_count() + 4)`` is used.
+        - ``thread_name_prefix``: Prefix for the names of the worker threads.
+        - ``max_in_flight``: The maximum number of tasks submitted but not yet completed. Default is ``4*max_workers``.
 
     Returns
     -------
-    Iterator
-        The output of the mapping operation. Equivalent to ``map(mappable,*args)``.
+    list
+        The output of the mapping operation. Equivalent to ``list(map(mappable,*args))``; every task has run by the
+        time this returns, whatever the number of threads.
 
     Notes
     -----
 
-    This function utilizes the ``concurrent.futures`` ``ThreadPoolExecutor``.
+    This function utilizes the ``concurrent.futures`` ``ThreadPoolExecutor``. Tasks are submitted lazily: a new task is
+    only submitted once one of the ``max_in_flight`` pending tasks completes, so a single slow task never holds up the
+    rest of the pool and the arguments are never fully materialized. The results are returned in the order of ``args``.
     """
-
-    from concurrent.futures import ThreadPoolExecutor
+    import os
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
     # ---------------------------------------- #
     # Setup the threading environment          #
     # ---------------------------------------- #
-    # Create the kwargs if they don't exist.
-    if threading_kw is None:
-        threading_kw = {}
+    # The options are popped from a copy, so the caller's dict can be reused.
+    threading_kw = dict(threading_kw or {})
 
     _max_workers = threading_kw.pop("max_workers", 1)
     if _max_workers == 1:
-        _threading = False
-    else:
-        _threading = True
+        return list(map(mappable, *args))
+
+    if _max_workers is None:
+        _max_workers = min(32, (os.cpu_count() or 1) + 4)
+    _max_in_flight = threading_kw.pop("max_in_flight", 4 * _max_workers)
 
     # ---------------------------------------- #
     # Run the threads                          #
     # ---------------------------------------- #
-    if _threading:
-        with ThreadPoolExecutor(
-            max_workers=_max_workers,
-            thread_name_prefix=threading_kw.pop("thread_name_prefix", ""),
-        ) as executor:
-            results = executor.map(mappable, *args)
-    else:
-        results = map(mappable, *args)
-
-    return results
+    results, pending = {}, {}
+    with ThreadPoolExecutor(
+        max_workers=_max_workers,
+        thread_name_prefix=threading_kw.pop("thread_name_prefix", ""),
+    ) as executor:
+        for i, _args in enumerate(zip(*args)):
+            if len(pending) >= _max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+
+            pending[executor.submit(mappable, *_args)] = i
+
+        for future in wait(pending).done:
+            results[pending[future]] = future.result()
+
+    return [results[i] for i in range(len(results))]
+
+
+class _RateLimiter:
+    # Token bucket limiting the rate of (remote) requests. It is shared by all of the threads querying a database;
+    # each request reserves a token, so waiting requests are served in order instead of racing for the next token.
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate, self.burst = rate, burst
+        self._tokens, self._last = float(burst), time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= 1
+            _wait = -self._tokens / self.rate
+
+        if _wait > 0:
+            time.sleep(_wait)
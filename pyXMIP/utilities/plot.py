@@ -69,6 +69,12 @@ def replace_axes(ax: plt.Axes, fig: plt.Figure = None, *args, **kwargs):
     return fig.add_axes(position, *args, **kwargs)
 
 
+@functools.lru_cache(maxsize=None)
+def _get_colormap(name: str):
+    # The colormap registry hands back a fresh copy on every lookup; cache them by name.
+    return plt.colormaps[name]
+
+
 def image_histogram_equalization(
     image: np.ndarray,
     bins: int | Sequence[Number] = 256,
@@ -117,9 +123,14 @@ def image_histogram_equalization(
 
     # -- Interpolate -- #
     # use linear interpolation of cdf to find new pixel values
-    image_equalized = np.interp(image.flatten(), bin_centers, cdf)
+    image_equalized = np.interp(image.ravel(), bin_centers, cdf)
+
+    image_equalized = image_equalized.reshape(image.shape)
+    if np.issubdtype(image.dtype, np.floating):
+        # keep the precision of floating point input; the CDF values can't be represented by integer types.
+        image_equalized = image_equalized.astype(image.dtype, copy=False)
 
-    return image_equalized.reshape(image.shape)
+    return image_equalized
 
 
 def get_hips_data(
@@ -192,7 +203,8 @@ def get_hips_image(
 
     # The image is always returned as a fits HDUList, but may be different shapes.
     header = image_data[0].header
-    data = np.array(image_data[0].data, dtype=float)
+    # single precision is plenty for an image that ends up as 8-bit RGBA.
+    data = np.array(image_data[0].data, dtype=np.float32)
 
     if data.ndim == 3:
         # This is a complete image as is.
@@ -208,9 +220,11 @@ def get_hips_image(
                 vmax=eq_kwargs.pop("eq_vmax", 1.0),
             )
 
-        cmap = eq_kwargs.pop(
-            "cmap", getattr(plt.cm, pxconfig.config.plotting.hips_defaults.cmap)
-        )
+        cmap = eq_kwargs.pop("cmap", None)
+        if cmap is None:
+            cmap = pxconfig.config.plotting.hips_defaults.cmap
+        if isinstance(cmap, str):
+            cmap = _get_colormap(cmap)
 
         image = cmap(data)
 
@@ -301,10 +315,17 @@ def plot_healpix(
     # -------------------------------------------- #
     # Adding the map to the axes.
     # -------------------------------------------- #
+    # The data range is only needed (and only computed) when the caller didn't supply it.
+    vmin, vmax = kwargs.pop("vmin", None), kwargs.pop("vmax", None)
+    if vmin is None:
+        vmin = np.amin(healpix_map)
+    if vmax is None:
+        vmax = np.amax(healpix_map)
+
     img = ax.projmap(
         healpix_map,
-        vmin=kwargs.pop("vmin", np.amin(healpix_map)),
-        vmax=kwargs.pop("vmax", np.amax(healpix_map)),
+        vmin=vmin,
+        vmax=vmax,
         cmap=kwargs.pop("cmap", "viridis"),
         badcolor=kwargs.pop("fillna", "black"),
         bgcolor=kwargs.pop("facecolor", "w"),
@@ -727,7 +727,7 @@ class ICRSCoordinateStdErrorSpecifier(BaseModel):
     def mode(self):
         if self.position_error is not None:
             return "circular"
-        elif all([cerr is not None for cerr in [self.lat_error, self.lon_error]]):
+        elif self.lat_error is not None and self.lon_error is not None:
             return "axial"
         else:
             return None
@@ -742,18 +742,20 @@ class ICRSCoordinateStdErrorSpecifier(BaseModel):
 
         The only check performed by this validator is that either the lat/lon error is specified or the circular is specified.
         """
-        if all(
-            [i is None for i in [self.lat_error, self.lon_error, self.position_error]]
+        if (
+            self.lat_error is None
+            and self.lon_error is None
+            and self.position_error is None
         ):
             return self
 
         if self.position_error is None:
-            assert not any(
-                cerr is None for cerr in [self.lat_error, self.lon_error]
+            assert (
+                self.lat_error is not None and self.lon_error is not None
             ), f"CoordinateErrorSpecifier {self} is not circular but doesn't have 2 axes for position error."
 
         else:
-            for cerr in [self.lat_error, self.lon_error]:
+            for cerr in (self.lat_error, self.lon_error):
                 if cerr is not None:
                     mainlog.warning(
                         f"CoordinateErrorSpecifier {self} is in MODE=circular, but axial errors are specified: {cerr}."
@@ -762,9 +764,8 @@ class ICRSCoordinateStdErrorSpecifier(BaseModel):
         return self
 
     def check_empty(self):
-        assert any(
-            [
-                i is not None
-                for i in [self.lat_error, self.lon_error, self.position_error]
-            ]
+        assert (
+            self.lat_error is not None
+            or self.lon_error is not None
+            or self.position_error is not None
         ), "At least one error specifier is needed."